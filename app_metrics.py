@@ -0,0 +1,218 @@
+import io
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+#################################################################################
+## In-process instrumentation of the Streamlit app, one instance per server:
+##   - rerun timing and counts per page (with a latency histogram)
+##   - bytes pushed per st.download_button / st.image / st.video payload
+##   - gauges read when the metrics are looked at (cache sizes, RSS, ...)
+## Recording is a perf_counter and a few dict updates under a lock; the gauges
+## (some of which walk caches) only run for the diagnostics page or a scrape.
+## prometheus_text() renders everything in the Prometheus text format, and
+## serve() exposes it over HTTP at /metrics.
+#################################################################################
+
+RERUN_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DIAGNOSTICS_PORT = os.environ.get("DIAGNOSTICS_PORT")
+
+# the diagnostics page is shown for ?diagnostics=<DIAGNOSTICS_KEY>, and not at
+# all unless DIAGNOSTICS_KEY is set
+DIAGNOSTICS_KEY = os.environ.get("DIAGNOSTICS_KEY")
+
+
+#################################################################################
+## Size in bytes of anything handed to st.download_button / st.image / st.video
+## (a path is measured on disk, a callable is generated later and counts 0)
+#################################################################################
+
+def payload_size(data):
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return len(data)
+    if isinstance(data, str):
+        return os.path.getsize(data) if os.path.isfile(data) else len(data.encode())
+    if isinstance(data, os.PathLike):
+        return os.path.getsize(data)
+    if isinstance(data, io.BytesIO):
+        return data.getbuffer().nbytes
+    if hasattr(data, "nbytes"):
+        return int(data.nbytes)
+
+    return 0
+
+
+#################################################################################
+## Resident memory of a process (current and peak, in bytes) from /proc
+#################################################################################
+
+def process_rss(pid="self"):
+    values = {}
+    try:
+        with open(f"/proc/{pid}/status", "r") as file:
+            for line in file:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    key, value, unit = line.split()
+                    values[key[:-1]] = int(value) * 1024
+    except FileNotFoundError:
+        pass
+
+    return values.get("VmRSS", 0), values.get("VmHWM", 0)
+
+
+#################################################################################
+## Memory held by Streamlit's own caches (st.cache_data/st.cache_resource,
+## media files, session state), by cache type
+#################################################################################
+
+def streamlit_cache_bytes():
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.stats import CACHE_MEMORY_FAMILY
+
+    if not Runtime.exists():
+        return {}
+    sizes = {}
+    for stat in Runtime.instance().stats_mgr.get_stats([CACHE_MEMORY_FAMILY]).get(CACHE_MEMORY_FAMILY, []):
+        sizes[stat.category_name] = sizes.get(stat.category_name, 0) + stat.byte_length
+
+    return sizes
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class AppMetrics:
+
+    def __init__(self):
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._reruns = {}
+        self._payloads = {}
+        self._gauges = {}
+
+    # ---------------------------------------------------------------------------
+    # Recording, called from the app script
+    # ---------------------------------------------------------------------------
+    def record_rerun(self, page, seconds):
+        with self._lock:
+            entry = self._reruns.get(page)
+            if entry is None:
+                entry = self._reruns[page] = {"count": 0, "seconds": 0.0, "max": 0.0,
+                                              "buckets": [0] * len(RERUN_BUCKETS)}
+            entry["count"] += 1
+            entry["seconds"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+            for k, bound in enumerate(RERUN_BUCKETS):
+                if seconds <= bound:
+                    entry["buckets"][k] += 1
+                    break
+
+    def record_payload(self, page, kind, name, nbytes):
+        with self._lock:
+            entry = self._payloads.get((page, kind, name))
+            if entry is None:
+                entry = self._payloads[(page, kind, name)] = {"count": 0, "bytes": 0, "last": 0}
+            entry["count"] += 1
+            entry["bytes"] += nbytes
+            entry["last"] = nbytes
+
+    def track(self, page, kind, data, name=None):
+        # records the payload and hands it back, for use inline in st.* calls
+        self.record_payload(page, kind, name or str(data), payload_size(data))
+        return data
+
+    # ---------------------------------------------------------------------------
+    # A gauge is read on demand: 'read' returns a number, or a dict of
+    # {label value: number} with 'label' naming the label
+    # ---------------------------------------------------------------------------
+    def register_gauge(self, name, help_text, read, label=None):
+        self._gauges[name] = (help_text, read, label)
+
+    def read_gauges(self):
+        values = {}
+        for name, (help_text, read, label) in list(self._gauges.items()):
+            try:
+                values[name] = read()
+            except Exception:
+                values[name] = None
+
+        return values
+
+    def snapshot(self):
+        with self._lock:
+            reruns = {page: dict(entry, buckets=list(entry["buckets"])) for page, entry in self._reruns.items()}
+            payloads = {key: dict(entry) for key, entry in self._payloads.items()}
+
+        return reruns, payloads, self.read_gauges()
+
+    # ---------------------------------------------------------------------------
+    # Prometheus text exposition format
+    # ---------------------------------------------------------------------------
+    def prometheus_text(self):
+        reruns, payloads, gauges = self.snapshot()
+        lines = [
+            "# HELP app_uptime_seconds Seconds since the metrics were created.",
+            "# TYPE app_uptime_seconds gauge",
+            f"app_uptime_seconds {time.time() - self.started:.3f}",
+            "# HELP app_rerun_seconds Script rerun time by page.",
+            "# TYPE app_rerun_seconds histogram",
+        ]
+        for page, entry in sorted(reruns.items()):
+            label = f'page="{_escape(page)}"'
+            cumulative = 0
+            for bound, n in zip(RERUN_BUCKETS, entry["buckets"]):
+                cumulative += n
+                lines.append(f'app_rerun_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'app_rerun_seconds_bucket{{{label},le="+Inf"}} {entry["count"]}')
+            lines.append(f'app_rerun_seconds_sum{{{label}}} {entry["seconds"]:.6f}')
+            lines.append(f'app_rerun_seconds_count{{{label}}} {entry["count"]}')
+
+        lines += ["# HELP app_payload_bytes_total Bytes handed to media and download elements.",
+                  "# TYPE app_payload_bytes_total counter"]
+        lines += [f'app_payload_bytes_total{{page="{_escape(page)}",element="{kind}",name="{_escape(name)}"}} '
+                  f'{entry["bytes"]}' for (page, kind, name), entry in sorted(payloads.items())]
+        lines += ["# HELP app_payloads_total Media and download elements sent.",
+                  "# TYPE app_payloads_total counter"]
+        lines += [f'app_payloads_total{{page="{_escape(page)}",element="{kind}",name="{_escape(name)}"}} '
+                  f'{entry["count"]}' for (page, kind, name), entry in sorted(payloads.items())]
+
+        for name, value in gauges.items():
+            help_text, read, label = self._gauges[name]
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            if isinstance(value, dict):
+                lines += [f'{name}{{{label}="{_escape(key)}"}} {number}' for key, number in sorted(value.items())]
+            elif value is not None:
+                lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    # ---------------------------------------------------------------------------
+    # Serves prometheus_text() at http://<host>:<port>/metrics from a daemon
+    # thread, for scrapers that cannot reach the app through Streamlit. Only
+    # local by default: pass host="0.0.0.0" to expose it.
+    # ---------------------------------------------------------------------------
+    def serve(self, port, host="127.0.0.1"):
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, int(port)), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        return server
@@ -0,0 +1,179 @@
+import hashlib
+import io
+import sys
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from hess_smith_panel_method import SOLVER_VERSION, naca_4series_generator
+
+#################################################################################
+## Cp charts for the Streamlit app, two ways:
+##   - cp_chart_spec: a Vega-Lite spec with a decimated Cp curve, drawn by the
+##     browser (a few KB of JSON, no server-side rasterizing, no matplotlib)
+##   - render_cp: a PNG/SVG figure for download, rendered with matplotlib only
+##     when asked for and kept in an LRU cache keyed by a hash of the result
+## Both draw the same airfoil outline under the Cp curve (airfoil_overlay).
+#################################################################################
+
+CHART_POINTS = 240
+
+OUTLINE_PANELS = 80
+
+RENDER_CACHE_MAX_BYTES = 64 * 2 ** 20
+
+# Cp axis limits of the rendered figure (suction up, like the scripts' plots)
+CP_LIMITS = (1.25, -2.5)
+
+
+def result_key(naca, alpha, npanel, cp):
+    digest = hashlib.sha1(f"{naca}|{float(alpha):.4f}|{int(npanel)}|{SOLVER_VERSION}".encode())
+    digest.update(np.ascontiguousarray(cp, dtype=np.float32).tobytes())
+
+    return digest.hexdigest()[:24]
+
+
+#################################################################################
+## Airfoil outline shared by both chart paths. The outline is drawn on its own
+## y scale, with 'y_domain' placing it along the bottom of the plot.
+#################################################################################
+
+@lru_cache(maxsize=64)
+def airfoil_overlay(naca, npanel=OUTLINE_PANELS):
+    x, y = naca_4series_generator([int(d) for d in naca], npanel)
+    low = y.min() - 0.02
+    y_domain = (low, low + 5 * (y.max() - low + 0.02))
+    x.flags.writeable = False
+    y.flags.writeable = False
+
+    return x, y, y_domain
+
+
+#################################################################################
+## Min/max decimation of Cp in panel order: every bucket of consecutive panels
+## keeps its lowest and highest Cp, so the suction peak and the stagnation
+## point survive however few points are sent. Returns the kept panel indices.
+#################################################################################
+
+def decimate_cp(cp, max_points=CHART_POINTS):
+    n = len(cp)
+    if n <= max_points:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, max_points // 2 + 1).astype(int)
+    keep = [0, n - 1]
+    for start, stop in zip(edges[:-1], edges[1:]):
+        segment = cp[start:stop]
+        keep.append(start + int(np.argmin(segment)))
+        keep.append(start + int(np.argmax(segment)))
+
+    return np.unique(keep)
+
+
+#################################################################################
+## Vega-Lite spec for st.vega_lite_chart (data embedded in the spec)
+#################################################################################
+
+def cp_chart_spec(naca, alpha, npanel, xbar, cp, max_points=CHART_POINTS):
+    keep = decimate_cp(cp, max_points)
+    x, y, y_domain = airfoil_overlay(naca)
+    x_scale = {"domain": [0, 1]}
+
+    return {
+        "layer": [
+            {
+                "data": {"values": [{"x/c": round(float(a), 5), "y/c": round(float(b), 5), "i": i}
+                                    for i, (a, b) in enumerate(zip(x, y))]},
+                "mark": {"type": "line", "color": "#9e9e9e", "strokeWidth": 1},
+                "encoding": {
+                    "x": {"field": "x/c", "type": "quantitative", "scale": x_scale},
+                    "y": {"field": "y/c", "type": "quantitative", "axis": None,
+                          "scale": {"domain": list(y_domain)}},
+                    "order": {"field": "i"},
+                },
+            },
+            {
+                "data": {"values": [{"x/c": round(float(xbar[i]), 5), "Cp": round(float(cp[i]), 5), "i": int(i)}
+                                    for i in keep]},
+                "mark": {"type": "line", "point": {"size": 12}, "tooltip": True},
+                "encoding": {
+                    "x": {"field": "x/c", "type": "quantitative", "scale": x_scale},
+                    "y": {"field": "Cp", "type": "quantitative", "scale": {"reverse": True}},
+                    "order": {"field": "i"},
+                },
+            },
+        ],
+        "resolve": {"scale": {"y": "independent"}},
+        "title": f"NACA {naca}, α = {alpha}°, {npanel} panels",
+    }
+
+
+#################################################################################
+## Rendered figures, cached by result hash and format
+#################################################################################
+
+_render_cache = OrderedDict()
+_render_lock = threading.Lock()
+_render_counts = {"hits": 0, "misses": 0}
+
+
+def _render(naca, alpha, npanel, xbar, cp, fmt):
+    # Figure without pyplot: no global figure manager, safe from any thread
+    from matplotlib.figure import Figure
+
+    x, y, y_domain = airfoil_overlay(naca)
+    fig = Figure(figsize=(8, 5), tight_layout=True)
+    ax = fig.add_subplot()
+    outline = ax.twinx()
+    outline.fill(x, y, color="0.85", edgecolor="0.6", linewidth=0.8)
+    outline.set_ylim(*y_domain)
+    outline.set_axis_off()
+    ax.set_zorder(outline.get_zorder() + 1)
+    ax.patch.set_visible(False)
+
+    ax.plot(xbar, cp, 'b')
+    ax.set_xlim(0, 1)
+    ax.set_ylim(*CP_LIMITS)
+    ax.set_xlabel('Chord Position')
+    ax.set_ylabel('$c_p$')
+    ax.set_title(f"NACA {naca}, α = {alpha}°, {npanel} panels")
+    ax.grid(True)
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=120)
+
+    return buffer.getvalue()
+
+
+def render_cp(naca, alpha, npanel, xbar, cp, fmt="png"):
+    key = (result_key(naca, alpha, npanel, cp), fmt)
+    with _render_lock:
+        data = _render_cache.get(key)
+        if data is not None:
+            _render_cache.move_to_end(key)
+            _render_counts["hits"] += 1
+            return data
+        _render_counts["misses"] += 1
+
+    data = _render(naca, alpha, npanel, xbar, cp, fmt)
+
+    with _render_lock:
+        _render_cache[key] = data
+        total = sum(len(value) for value in _render_cache.values())
+        while total > RENDER_CACHE_MAX_BYTES and len(_render_cache) > 1:
+            total -= len(_render_cache.popitem(last=False)[1])
+
+    return data
+
+
+def render_cache_stats():
+    with _render_lock:
+        return {
+            "entries": len(_render_cache),
+            "bytes": sum(len(value) for value in _render_cache.values()),
+            **_render_counts,
+        }
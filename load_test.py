@@ -0,0 +1,351 @@
+import argparse
+import asyncio
+import os
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+
+from app_metrics import process_rss
+
+#################################################################################
+## Load harness for the portfolio app: simulates many visitors navigating all
+## pages and reports rerun latency (p50/p95/max), bytes sent and peak RSS.
+##
+## Two drivers:
+##   apptest    headless, built on streamlit.testing.v1.AppTest. AppTest swaps
+##              a process-global Runtime on every run, so sessions take turns
+##              (round-robin) in one process: this measures the cost of each
+##              rerun and the memory of N live sessions sharing the same caches,
+##              not contention.
+##   websocket  real concurrent sessions against a running server, speaking the
+##              browser's protobuf protocol on /_stcore/stream (optionally
+##              launching `streamlit run` itself so the server RSS is sampled).
+##              Needs the websockets package, which the app does not.
+##
+##   python load_test.py --sessions 50 --rounds 8
+##   python load_test.py --driver websocket --launch --sessions 50 --rounds 8
+#################################################################################
+
+APP_PATH = str(Path(__file__).resolve().parent / "main.py")
+
+
+#################################################################################
+## Report from a list of (page, rerun seconds) samples, overall and per page
+#################################################################################
+
+def summarize(driver, sessions, samples, message_bytes, media_bytes, peak_rss, errors, wall):
+    pages = {}
+    for page, seconds in samples:
+        pages.setdefault(page, []).append(seconds)
+    latencies = np.array([seconds for page, seconds in samples]) if samples else np.zeros(1)
+    reruns = len(samples)
+
+    return {
+        "driver": driver,
+        "sessions": sessions,
+        "reruns": reruns,
+        "errors": errors,
+        "wall_s": wall,
+        "reruns_per_s": reruns / wall if wall > 0 else 0.0,
+        "p50_ms": 1000 * float(np.percentile(latencies, 50)),
+        "p95_ms": 1000 * float(np.percentile(latencies, 95)),
+        "max_ms": 1000 * float(latencies.max()),
+        "message_bytes": message_bytes,
+        "media_bytes": media_bytes,
+        "bytes_per_rerun": (message_bytes + media_bytes) / max(reruns, 1),
+        "peak_rss_mb": peak_rss / 2 ** 20,
+        "pages": {page: f"n={len(times)}  p50={1000 * np.percentile(times, 50):.1f} ms"
+                        f"  p95={1000 * np.percentile(times, 95):.1f} ms"
+                  for page, times in sorted(pages.items())},
+    }
+
+
+def print_report(report):
+    width = max(len(key) for key in report)
+    for key, value in report.items():
+        if isinstance(value, dict):
+            print(key)
+            pad = max((len(page) for page in value), default=0)
+            for page, line in value.items():
+                print(f"  {page:<{pad}}  {line}")
+            continue
+        if isinstance(value, float):
+            value = f"{value:.2f}"
+        print(f"{key:<{width}}  {value}")
+
+
+#################################################################################
+## AppTest driver. Message bytes are counted from the ForwardMsgs each run
+## produces and media bytes from files registered with the media manager
+## (images and download_button payloads).
+#################################################################################
+
+def _current_page(at):
+    return at.sidebar.radio[0].value if at.sidebar.radio else "?"
+
+
+def _run_error(at):
+    # what went wrong in the last rerun, or None
+    if at.exception:
+        return at.exception[0].message
+    if not at.sidebar.radio:
+        return "no navigation"
+
+    return None
+
+
+def run_apptest(app_path, sessions, rounds, seed=0, timeout=60):
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.testing.v1 import AppTest
+    from streamlit.testing.v1 import local_script_runner
+
+    counters = {"message_bytes": 0, "media_bytes": 0}
+
+    # ---------------------------------------------------------------------------
+    # STEP 1: count the bytes every run would put on the wire
+    # ---------------------------------------------------------------------------
+    parse_tree = local_script_runner.parse_tree_from_messages
+    load_media = MemoryMediaFileStorage.load_and_get_id
+
+    def counting_parse_tree(messages):
+        counters["message_bytes"] += sum(message.ByteSize() for message in messages)
+        return parse_tree(messages)
+
+    def counting_load_media(storage, path_or_data, *args, **kwargs):
+        if isinstance(path_or_data, (bytes, bytearray)):
+            counters["media_bytes"] += len(path_or_data)
+        else:
+            counters["media_bytes"] += os.path.getsize(path_or_data)
+        return load_media(storage, path_or_data, *args, **kwargs)
+
+    local_script_runner.parse_tree_from_messages = counting_parse_tree
+    MemoryMediaFileStorage.load_and_get_id = counting_load_media
+
+    # ---------------------------------------------------------------------------
+    # STEP 2: every session loads the app, then all sessions take turns
+    #         switching to a random page, 'rounds' times
+    # ---------------------------------------------------------------------------
+    rng = random.Random(seed)
+    samples = []
+    errors = 0
+    first_error = None
+    cwd = os.getcwd()
+    os.chdir(Path(app_path).parent)
+    t0 = time.perf_counter()
+    try:
+        apps = []
+        for s in range(sessions):
+            at = AppTest.from_file(app_path, default_timeout=timeout)
+            t = time.perf_counter()
+            at.run()
+            samples.append(("(load) " + _current_page(at), time.perf_counter() - t))
+            apps.append(at)
+            error = _run_error(at)
+            if error:
+                errors += 1
+                first_error = first_error or error
+
+        for r in range(rounds):
+            for at in apps:
+                # a session without navigation was counted when it lost it
+                if not at.sidebar.radio:
+                    continue
+                page = rng.choice(at.sidebar.radio[0].options)
+                at.sidebar.radio[0].set_value(page)
+                t = time.perf_counter()
+                at.run()
+                samples.append((page, time.perf_counter() - t))
+                error = _run_error(at)
+                if error:
+                    errors += 1
+                    first_error = first_error or error
+    finally:
+        wall = time.perf_counter() - t0
+        os.chdir(cwd)
+        local_script_runner.parse_tree_from_messages = parse_tree
+        MemoryMediaFileStorage.load_and_get_id = load_media
+
+    if first_error:
+        print(f"first error: {first_error}", file=sys.stderr)
+
+    return summarize("apptest", sessions, samples, counters["message_bytes"], counters["media_bytes"],
+                     resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024, errors, wall)
+
+
+#################################################################################
+## Websocket driver: one asyncio task per simulated visitor
+#################################################################################
+
+def start_server(app_path, port):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", app_path, "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=Path(app_path).parent, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    for _ in range(300):
+        try:
+            urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1)
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("streamlit server did not start")
+
+
+def _media_urls(message):
+    delta = message.delta
+    if not delta.HasField("new_element"):
+        return []
+    element = delta.new_element
+    kind = element.WhichOneof("type")
+    if kind == "imgs":
+        return [img.url for img in element.imgs.imgs]
+    if kind == "download_button":
+        return [element.download_button.url]
+    if kind == "video":
+        return [element.video.url]
+
+    return []
+
+
+async def _visitor(url, rounds, rng, fetch_media, results):
+    import websockets
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    http_base = url.replace("ws://", "http://").rsplit("/_stcore", 1)[0]
+
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        page_hash = ""
+        radio = None
+
+        # -----------------------------------------------------------------------
+        # one rerun: send the client state, read until the script finishes
+        # -----------------------------------------------------------------------
+        async def rerun(page=None):
+            nonlocal page_hash, radio
+            back = BackMsg()
+            back.rerun_script.query_string = ""
+            back.rerun_script.page_script_hash = page_hash
+            if page is not None:
+                state = back.rerun_script.widget_states.widgets.add()
+                state.id = radio.id
+                # radios are sent as the chosen option's label
+                state.string_value = radio.options[page]
+            t = time.perf_counter()
+            await ws.send(back.SerializeToString())
+
+            media = []
+            while True:
+                frame = await ws.recv()
+                results["message_bytes"] += len(frame)
+                message = ForwardMsg()
+                message.ParseFromString(frame)
+                kind = message.WhichOneof("type")
+                if kind == "new_session":
+                    page_hash = message.new_session.page_script_hash
+                elif kind == "delta" and message.delta.HasField("new_element"):
+                    element_type = message.delta.new_element.WhichOneof("type")
+                    if element_type == "radio":
+                        radio = message.delta.new_element.radio
+                    elif element_type == "exception":
+                        results["errors"] += 1
+                    media.extend(_media_urls(message))
+                elif kind == "script_finished":
+                    break
+            name = radio.options[radio.default if page is None else page] if radio is not None else "?"
+            results["samples"].append((name if page is not None else "(load) " + name, time.perf_counter() - t))
+
+            if fetch_media:
+                for media_url in media:
+                    data = await asyncio.to_thread(
+                        lambda u=media_url: urllib.request.urlopen(http_base + u, timeout=30).read())
+                    results["media_bytes"] += len(data)
+
+        await rerun()
+        for r in range(rounds):
+            if radio is None:
+                results["errors"] += 1
+                return
+            await rerun(rng.randrange(len(radio.options)))
+
+
+def run_websocket(url, sessions, rounds, seed=0, fetch_media=True, server_pid=None):
+    results = {"samples": [], "message_bytes": 0, "media_bytes": 0, "errors": 0}
+    peak = [0]
+    done = threading.Event()
+
+    # ---------------------------------------------------------------------------
+    # STEP 1: sample the server's RSS while the visitors run
+    # ---------------------------------------------------------------------------
+    def sample_rss():
+        while not done.is_set():
+            if server_pid is not None:
+                rss, hwm = process_rss(server_pid)
+                peak[0] = max(peak[0], hwm or rss)
+            time.sleep(0.05)
+
+    sampler = threading.Thread(target=sample_rss, daemon=True)
+    sampler.start()
+
+    # ---------------------------------------------------------------------------
+    # STEP 2: all visitors at once
+    # ---------------------------------------------------------------------------
+    async def main():
+        rng = random.Random(seed)
+        outcomes = await asyncio.gather(
+            *[_visitor(url, rounds, random.Random(rng.random()), fetch_media, results) for _ in range(sessions)],
+            return_exceptions=True)
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                results["errors"] += 1
+                print(f"session failed: {outcome!r}", file=sys.stderr)
+
+    t0 = time.perf_counter()
+    asyncio.run(main())
+    wall = time.perf_counter() - t0
+    done.set()
+    sampler.join()
+
+    return summarize("websocket", sessions, results["samples"], results["message_bytes"],
+                     results["media_bytes"], peak[0], results["errors"], wall)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the portfolio app")
+    parser.add_argument("--driver", choices=["apptest", "websocket"], default="apptest")
+    parser.add_argument("--app", default=APP_PATH)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=8, help="page changes per session")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", default=None, help="websocket driver: ws://host:port/_stcore/stream")
+    parser.add_argument("--port", type=int, default=8599)
+    parser.add_argument("--launch", action="store_true", help="websocket driver: start `streamlit run` first")
+    parser.add_argument("--no-media", action="store_true", help="websocket driver: skip fetching media files")
+    args = parser.parse_args()
+
+    if args.driver == "apptest":
+        report = run_apptest(args.app, args.sessions, args.rounds, args.seed)
+    else:
+        # not a dependency of the app, only of this driver
+        try:
+            import websockets
+        except ImportError:
+            parser.error("the websocket driver needs the websockets package: pip install websockets")
+        server = start_server(args.app, args.port) if args.launch else None
+        try:
+            url = args.url or f"ws://localhost:{args.port}/_stcore/stream"
+            report = run_websocket(url, args.sessions, args.rounds, args.seed, not args.no_media,
+                                   server.pid if server else None)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+    print_report(report)
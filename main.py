@@ -1,7 +1,17 @@
 import streamlit as st
 import os
+import time
 from pathlib import Path
 import base64
+from solver_jobs import SolverJobManager
+from polar_store import PolarStore
+from cp_charts import cp_chart_spec, render_cp, render_cache_stats
+from app_metrics import AppMetrics, DIAGNOSTICS_KEY, DIAGNOSTICS_PORT, process_rss, streamlit_cache_bytes
+from matrix_cache import FactorizationCache
+from functools import partial
+from script_runner import RUNNABLE_SCRIPTS, SCRIPTS_DIR, ScriptError, ScriptRunner, script_prompts
+
+rerun_started = time.perf_counter()
 
 def get_binary_file_downloader_html(bin_file, file_label='File'):
     with open(bin_file, 'rb') as f:
@@ -10,7 +20,103 @@ def get_binary_file_downloader_html(bin_file, file_label='File'):
     href = f'<a href="data:application/octet-stream;base64,{bin_str}" download="{Path(bin_file).name}">{file_label}</a>'
     return href
 
-py_files = [f for f in os.listdir("scripts") if f.endswith(".py")]
+@st.cache_resource
+def get_solver_jobs():
+    # solver workers shared by every session of this server
+    return SolverJobManager(max_workers=max(1, (os.cpu_count() or 2) // 2))
+
+@st.cache_resource
+def get_polar_store():
+    return PolarStore()
+
+@st.cache_resource
+def get_script_runner():
+    # pre-warmed workers shared by every session of this server
+    return ScriptRunner(workers=2)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def run_script(script, answers):
+    # the showcased scripts are deterministic, so identical runs are served from
+    # here (worker failures raise ScriptError and are not cached)
+    return get_script_runner().run(script, answers)
+
+@st.cache_data
+def get_script_prompts(script):
+    return script_prompts(SCRIPTS_DIR / script)
+
+@st.cache_resource
+def get_app_metrics():
+    metrics = AppMetrics()
+    metrics.register_gauge("app_process_rss_bytes", "Resident memory of the server process.",
+                           lambda: process_rss()[0])
+    metrics.register_gauge("app_streamlit_cache_bytes", "Memory held by Streamlit caches, media files and session state.",
+                           streamlit_cache_bytes, label="cache_type")
+    metrics.register_gauge("app_cp_render_cache_bytes", "Rendered Cp figures held in memory.",
+                           lambda: render_cache_stats()["bytes"])
+    metrics.register_gauge("app_factorization_cache_bytes", "LU factorizations in the host-wide cache.",
+                           lambda: FactorizationCache().stats()["bytes"])
+    metrics.register_gauge("app_polar_store_results", "Results in the polar store.", lambda: get_polar_store().count())
+    if DIAGNOSTICS_PORT:
+        metrics.serve(DIAGNOSTICS_PORT)
+    return metrics
+
+def show_diagnostics():
+    metrics = get_app_metrics()
+    reruns, payloads, gauges = metrics.snapshot()
+    st.title("Diagnostics")
+    st.subheader("Reruns by page")
+    st.dataframe([{"page": page, "reruns": entry["count"], "mean ms": 1000 * entry["seconds"] / entry["count"],
+                   "max ms": 1000 * entry["max"], "total s": entry["seconds"]}
+                  for page, entry in sorted(reruns.items(), key=lambda item: -item[1]["seconds"])])
+    st.subheader("Payloads")
+    st.dataframe([{"page": page, "element": kind, "name": name, "sent": entry["count"],
+                   "bytes each": entry["last"], "total bytes": entry["bytes"]}
+                  for (page, kind, name), entry in sorted(payloads.items(), key=lambda item: -item[1]["bytes"])])
+    st.subheader("Caches and memory")
+    st.json(gauges)
+    st.subheader("Prometheus")
+    st.code(metrics.prometheus_text(), language="text")
+
+def panel_method_status():
+    # runs as a fragment that polls every 0.5 s while a job is in flight
+    job_id = st.session_state.get("pm_job")
+    if job_id is not None:
+        state, progress, result = get_solver_jobs().poll(job_id)
+        if state == "running":
+            st.progress(progress, text="Solving...")
+            return
+        del st.session_state["pm_job"]
+        if state == "done":
+            naca, alpha, npanel = st.session_state["pm_inputs"]
+            get_polar_store().put(naca, npanel, alpha, result)
+            st.session_state["pm_result"] = (st.session_state["pm_inputs"], result)
+        elif state == "failed":
+            st.session_state["pm_error"] = f"Solver failed: {result}"
+        # full rerun to stop the polling timer
+        st.rerun()
+
+    if "pm_error" in st.session_state:
+        st.error(st.session_state.pop("pm_error"))
+
+    if "pm_result" in st.session_state:
+        (naca, alpha, npanel), (cl, cd, cm, xbar, cp) = st.session_state["pm_result"]
+        st.write(f"**NACA {naca}**, α = {alpha}°, {npanel} panels")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Cl", f"{cl:.4f}")
+        col2.metric("Cd", f"{cd:.5f}")
+        col3.metric("Cm", f"{cm:.4f}")
+        st.vega_lite_chart(cp_chart_spec(naca, alpha, npanel, xbar, cp), width="stretch")
+        # figures are only rendered (and then cached) when a download is clicked
+        col1, col2 = st.columns(2)
+        for col, fmt, mime in ((col1, "png", "image/png"), (col2, "svg", "image/svg+xml")):
+            col.download_button(f"Download Cp plot ({fmt.upper()})",
+                                data=partial(render_cp, naca, alpha, npanel, xbar, cp, fmt),
+                                file_name=f"naca{naca}_a{alpha:g}_cp.{fmt}", mime=mime, on_click="ignore")
+
+# only the standalone scripts described on the page; the other modules in
+# scripts/ are libraries for the solver and import hess_smith_panel_method
+showcased_scripts = ["naca_4series_geoplotter.py", "hess_smith_panel_method.py", "hess_smith_panel_method_uinputs.py"]
+py_files = [f for f in showcased_scripts if os.path.isfile(f"scripts/{f}")]
 video_files = [f for f in os.listdir("videos") if f.endswith(".mov")]
 image_files = [f for f in os.listdir("images") if f.endswith(".jpg") or f.endswith(".png")]
 fixed_image_files = [f for f in os.listdir("fixed_images") if f.endswith(".jpg") or f.endswith(".png")]
@@ -18,91 +124,155 @@ cad_files = [f for f in os.listdir("cad_files") if f.endswith(".stp") or f.endsw
 cad_images = [f for f in os.listdir("images") if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
 
 
-st.sidebar.title("Navigation")
-page = st.sidebar.radio("Go to:", ["🏠 Home", "🚀 Atlas V-401 Rocket: CAD creation", "🐍 Python Scripts", "✈ Scratch-Built RC Drone"])
-
-if page == "🏠 Home":
-    st.title("Welcome to My Portfolio! 🛩️")
-    st.write("This portfolio showcases a selection of personal and school projects that I have completed over the years. "
-    "Use the **navigation bar** on the left to explore a project further.")
-    st.markdown("---")
-    st.write("**Phone Number**: 516-497-0677")
-    st.write("**Email Address**: patrick.hillgarnder@gmail.com")
-    st.write("**LinkedIn**: https://www.linkedin.com/in/patrick-hillgardner-854868263/")
-    with open("assets/resume_v6.pdf", "rb") as file:
-        resume_bytes = file.read()
-
-    st.download_button(
-    label="📄 **Download My Resume**",
-    data=resume_bytes,
-    file_name="Patrick_Hillgardner_Resume.pdf",
-    mime="application/pdf"
-)
-    st.write(" ")
-    st.image("headshot.jpeg", width=250)
-    st.subheader("About the Author")
-    st.write("My name is Patrick Hillgardner, and I am currently a senior pursuing a degree in Aerospace Engineering at the University of Illinois at Urbana-Champaign. "
-         "My primary interests include propulsion, hypersonic technologies, and aircraft systems design. "
-         "I am passionate about contributing to the aerospace industry and am dedicated to fulfilling my lifelong aspiration of becoming a successful engineer!")
-
-
-elif page == "🚀 Atlas V-401 Rocket: CAD creation":
-    st.title("🚀 Atlas V-401 Rocket: CAD creation")
-    st.write("This project is a to-scale CAD model of the Atlas V-401 rocket created using Siemens NX. ")
-    st.info("🚧 **Interactive CAD Viewer Coming Soon!** 🚧\n\n "
-        "Due to the size and complexity of this model, a web-based viewer is currently under development. "
-        "You can download the CAD files below to view the model locally. "
-        "The .stp file is more compatible with most softwares, whereas the .zip file contains the original NX file and all its components, including the RD-180 engine.")
-    st.markdown("---")
-
-    # Display images neatly in a grid
-    cols = st.columns(2)
-    for idx, img in enumerate(cad_images):
-        with cols[idx % 2]:
-            st.image(f"images/{img}", use_container_width=True,)
-            st.markdown(f"<h8 style='text-align: center;'> CAD model render.", unsafe_allow_html=True)
-
-    cols2 = st.columns(2)
-    for idx2, img2 in enumerate(fixed_image_files):
-        with cols[idx2 % 2]:
-            st.image(f"fixed_images/{img2}", use_container_width=True)
-    st.markdown(f"<h8 style='text-align: center;'> CAD model (left) vs. NASA artist's concept (right) exploded view.", unsafe_allow_html=True)
-    st.info("❗️ **Note**: if viewing on a mobile device, the images may not display in the correct order ❗️")
-    st.markdown("---")
-    st.subheader("Download CAD Files")
-
-    for cad_file in cad_files:
-        with open(f"cad_files/{cad_file}", "rb") as file2:
-            file_bytes = file2.read()
+metrics = get_app_metrics()
+if DIAGNOSTICS_KEY and st.query_params.get("diagnostics") == DIAGNOSTICS_KEY:
+    # hidden page, not part of the navigation
+    show_diagnostics()
+    st.stop()
+
+# recorded however the rerun ends: st.rerun(), st.stop(), a widget change
+# interrupting it or an exception
+page = None
+try:
+    st.sidebar.title("Navigation")
+    page = st.sidebar.radio("Go to:", ["🏠 Home", "🚀 Atlas V-401 Rocket: CAD creation", "🐍 Python Scripts", "✈ Scratch-Built RC Drone"])
+
+    if page == "🏠 Home":
+        st.title("Welcome to My Portfolio! 🛩️")
+        st.write("This portfolio showcases a selection of personal and school projects that I have completed over the years. "
+        "Use the **navigation bar** on the left to explore a project further.")
+        st.markdown("---")
+        st.write("**Phone Number**: 516-497-0677")
+        st.write("**Email Address**: patrick.hillgarnder@gmail.com")
+        st.write("**LinkedIn**: https://www.linkedin.com/in/patrick-hillgardner-854868263/")
+        with open("assets/resume_v6.pdf", "rb") as file:
+            resume_bytes = file.read()
+
         st.download_button(
-            label=f"⬇️ Download {cad_file}",
-            data=file_bytes,  # pass the bytes, not the file object
-            file_name=cad_file,
-            mime="application/octet-stream"
-        )
+        label="📄 **Download My Resume**",
+        data=metrics.track(page, "download_button", resume_bytes, "resume_v6.pdf"),
+        file_name="Patrick_Hillgardner_Resume.pdf",
+        mime="application/pdf"
+    )
+        st.write(" ")
+        st.image(metrics.track(page, "image", "headshot.jpeg"), width=250)
+        st.subheader("About the Author")
+        st.write("My name is Patrick Hillgardner, and I am currently a senior pursuing a degree in Aerospace Engineering at the University of Illinois at Urbana-Champaign. "
+             "My primary interests include propulsion, hypersonic technologies, and aircraft systems design. "
+             "I am passionate about contributing to the aerospace industry and am dedicated to fulfilling my lifelong aspiration of becoming a successful engineer!")
+
+
+    elif page == "🚀 Atlas V-401 Rocket: CAD creation":
+        st.title("🚀 Atlas V-401 Rocket: CAD creation")
+        st.write("This project is a to-scale CAD model of the Atlas V-401 rocket created using Siemens NX. ")
+        st.info("🚧 **Interactive CAD Viewer Coming Soon!** 🚧\n\n "
+            "Due to the size and complexity of this model, a web-based viewer is currently under development. "
+            "You can download the CAD files below to view the model locally. "
+            "The .stp file is more compatible with most softwares, whereas the .zip file contains the original NX file and all its components, including the RD-180 engine.")
+        st.markdown("---")
+
+        # Display images neatly in a grid
+        cols = st.columns(2)
+        for idx, img in enumerate(cad_images):
+            with cols[idx % 2]:
+                st.image(metrics.track(page, "image", f"images/{img}"), use_container_width=True,)
+                st.markdown(f"<h8 style='text-align: center;'> CAD model render.", unsafe_allow_html=True)
+
+        cols2 = st.columns(2)
+        for idx2, img2 in enumerate(fixed_image_files):
+            with cols[idx2 % 2]:
+                st.image(metrics.track(page, "image", f"fixed_images/{img2}"), use_container_width=True)
+        st.markdown(f"<h8 style='text-align: center;'> CAD model (left) vs. NASA artist's concept (right) exploded view.", unsafe_allow_html=True)
+        st.info("❗️ **Note**: if viewing on a mobile device, the images may not display in the correct order ❗️")
+        st.markdown("---")
+        st.subheader("Download CAD Files")
+
+        for cad_file in cad_files:
+            with open(f"cad_files/{cad_file}", "rb") as file2:
+                file_bytes = file2.read()
+            st.download_button(
+                label=f"⬇️ Download {cad_file}",
+                data=metrics.track(page, "download_button", file_bytes, cad_file),  # pass the bytes, not the file object
+                file_name=cad_file,
+                mime="application/octet-stream"
+            )
     
 
-elif page == "🐍 Python Scripts":
-    st.title("🐍 Python Scripts")
-    st.write("This page showcases the Python scripts that I have created over the years.")
-    st.markdown("---")
-    st.write("**naca_4series_geoplotter.py** :  Python script that takes a user-entered 4-digit NACA airfoil and plots the normalized airfoil coordinates.")
-    st.write("**hess_smith_panel_method.py** :  Hess-Smith 2D panel method code that takes a defined NACA airfoil anfd angle of attack and computes the lift coefficient, drag coefficient, moment coefficient, and plots the pressure coefficient distribution.")
-    st.write("**hess_smith_panel_method_uinputs.py** :  Slightly modified version of the Hess-Smith panel method code that takes a user-entered 4-digit NACA airfoil, angle of attack, and number of panels and returns the resulting lift coefficient, drag coefficient, moment coefficient, and plots the pressure coefficient distribution.")
-    st.markdown("---")
-    selected_script = st.selectbox("Select a script:", py_files)
-    if selected_script:
-        with open(f"scripts/{selected_script}", "r") as file:
-            code = file.read()
-        with st.expander("📜 View Code (Click to Expand)"):
-            st.code(code, language='python')
-        st.markdown(get_binary_file_downloader_html(f"scripts/{selected_script}", "⬇️ Download Script"), unsafe_allow_html=True)
-
-elif page == "✈ Scratch-Built RC Drone":
-    st.title("✈ Scratch-Built RC Drone")
-    st.write("In early January 2025, I created a fully functional remote control drone made entirely out of foam boards- "
-    "the control surfaces and motor functions are shown in this video.")
-    st.markdown("---")
-    for video in video_files:
-        st.video(f"videos/{video}")
+    elif page == "🐍 Python Scripts":
+        st.title("🐍 Python Scripts")
+        st.write("This page showcases the Python scripts that I have created over the years.")
+        st.markdown("---")
+        st.write("**naca_4series_geoplotter.py** :  Python script that takes a user-entered 4-digit NACA airfoil and plots the normalized airfoil coordinates.")
+        st.write("**hess_smith_panel_method.py** :  Hess-Smith 2D panel method code that takes a defined NACA airfoil anfd angle of attack and computes the lift coefficient, drag coefficient, moment coefficient, and plots the pressure coefficient distribution.")
+        st.write("**hess_smith_panel_method_uinputs.py** :  Slightly modified version of the Hess-Smith panel method code that takes a user-entered 4-digit NACA airfoil, angle of attack, and number of panels and returns the resulting lift coefficient, drag coefficient, moment coefficient, and plots the pressure coefficient distribution.")
+        st.markdown("---")
+        selected_script = st.selectbox("Select a script:", py_files)
+        if selected_script:
+            with open(f"scripts/{selected_script}", "r") as file:
+                code = file.read()
+            with st.expander("📜 View Code (Click to Expand)"):
+                st.code(code, language='python')
+            st.markdown(get_binary_file_downloader_html(f"scripts/{selected_script}", "⬇️ Download Script"), unsafe_allow_html=True)
+        if selected_script in RUNNABLE_SCRIPTS:
+            # starts the workers (if needed) so they are importing while the form is filled in
+            get_script_runner()
+            # one widget per input() prompt of the script
+            with st.form("script_form"):
+                answers = []
+                for (prompt, kind), default in zip(get_script_prompts(selected_script), RUNNABLE_SCRIPTS[selected_script]):
+                    if kind == "int":
+                        answers.append(int(st.number_input(prompt, value=int(default), step=1)))
+                    elif kind == "float":
+                        answers.append(float(st.number_input(prompt, value=float(default))))
+                    else:
+                        answers.append(st.text_input(prompt, str(default)))
+                run_submitted = st.form_submit_button(f"▶ Run {selected_script}")
+            if run_submitted:
+                try:
+                    with st.spinner("Running..."):
+                        output = run_script(selected_script, tuple(answers))
+                except ScriptError as error:
+                    output = {"stdout": "", "figures": [], "error": str(error)}
+                if output["error"]:
+                    st.error(output["error"])
+                if output["stdout"]:
+                    st.code(output["stdout"], language="text")
+                for figure in output["figures"]:
+                    st.image(metrics.track(page, "image", figure, f"{selected_script} figure"))
+        st.markdown("---")
+        st.subheader("✈ Run the Panel Method")
+        with st.form("pm_form"):
+            naca = st.text_input("NACA 4-digit airfoil:", "2412")
+            alpha = st.number_input("Angle of attack (degrees):", -15.0, 20.0, 4.0, 0.5)
+            npanel = st.number_input("Number of panels (even):", 20, 4000, 200, 2)
+            submitted = st.form_submit_button("Run")
+        if submitted:
+            if len(naca) != 4 or not naca.isdigit():
+                st.error("Please enter the four digits of a NACA 4-series airfoil.")
+            elif naca[2:] == "00":
+                st.error("Please choose an airfoil with a nonzero thickness (the last two digits)!")
+            elif npanel % 2 != 0:
+                st.error("Please choose an even number of panels!")
+            else:
+                st.session_state["pm_inputs"] = (naca, alpha, int(npanel))
+                stored = get_polar_store().get(naca, int(npanel), alpha)
+                if stored is not None:
+                    if "pm_job" in st.session_state:
+                        get_solver_jobs().cancel(st.session_state.pop("pm_job"))
+                    st.session_state["pm_result"] = (st.session_state["pm_inputs"], stored)
+                else:
+                    # a new run replaces (and cancels) this session's previous one
+                    st.session_state["pm_job"] = get_solver_jobs().submit(
+                        alpha, [int(d) for d in naca], int(npanel), supersedes=st.session_state.get("pm_job"))
+                    st.session_state.pop("pm_result", None)
+        st.fragment(panel_method_status, run_every=0.5 if "pm_job" in st.session_state else None)()
 
+    elif page == "✈ Scratch-Built RC Drone":
+        st.title("✈ Scratch-Built RC Drone")
+        st.write("In early January 2025, I created a fully functional remote control drone made entirely out of foam boards- "
+        "the control surfaces and motor functions are shown in this video.")
+        st.markdown("---")
+        for video in video_files:
+            st.video(metrics.track(page, "video", f"videos/{video}"))
+finally:
+    metrics.record_rerun(page or "(no page)", time.perf_counter() - rerun_started)
@@ -0,0 +1,201 @@
+import fcntl
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from hess_smith_panel_method import (SOLVER_VERSION, ASSEMBLY_BLOCK_ROWS, panel_geometry, infl_coeff,
+                                     factor_influence_matrix)
+
+#################################################################################
+## Host-wide cache of LU factorizations of the influence matrix 'A', shared by
+## every Streamlit server process (and their solver pools) on one machine.
+##
+## Each factorization is published once as two .npy files (lu, piv) named by a
+## hash of the panel geometry and SOLVER_VERSION, in /dev/shm when available. Every process maps
+## the same files read-only, so the (N+1)x(N+1) factor exists once in memory no
+## matter how many workers use it. A JSON registry, guarded by an flock, keeps
+## per-process reference counts and last-use times:
+##   - entries in use are never evicted
+##   - unused entries are evicted least recently used first beyond max_bytes
+##   - references held by processes that have exited are dropped
+## (Plain mmap'd files are used instead of multiprocessing.shared_memory, whose
+## resource tracker unlinks segments when any attaching process exits.)
+#################################################################################
+
+CACHE_DIR = os.environ.get(
+    "HESS_SMITH_CACHE_DIR",
+    os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "hess_smith_factors"))
+
+CACHE_MAX_BYTES = 512 * 2 ** 20
+
+REGISTRY_FILE = "registry.json"
+LOCK_FILE = "registry.lock"
+
+
+# the files outlive the app (/dev/shm survives restarts and deploys), so a
+# solver change must not find the old factorizations
+def geometry_key(x, y):
+    digest = hashlib.sha1(f"solver {SOLVER_VERSION}".encode())
+    for array in (x, y):
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+
+    return digest.hexdigest()[:24]
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
+
+
+class FactorizationCache:
+
+    def __init__(self, root=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    # ---------------------------------------------------------------------------
+    # Registry access under an exclusive lock. Dead processes' references are
+    # dropped on every access.
+    # ---------------------------------------------------------------------------
+    @contextmanager
+    def _registry(self):
+        with open(self.root / LOCK_FILE, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(self.root / REGISTRY_FILE, "r") as file:
+                        registry = json.load(file)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    registry = {}
+
+                for entry in registry.values():
+                    entry["refs"] = {pid: n for pid, n in entry["refs"].items() if n > 0 and _pid_alive(int(pid))}
+
+                yield registry
+
+                tmp = self.root / (REGISTRY_FILE + ".tmp")
+                with open(tmp, "w") as file:
+                    json.dump(registry, file)
+                os.replace(tmp, self.root / REGISTRY_FILE)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _paths(self, key):
+        return self.root / f"{key}.lu.npy", self.root / f"{key}.piv.npy"
+
+    # ---------------------------------------------------------------------------
+    # Takes a reference to 'key' if it is published, returns False otherwise
+    # ---------------------------------------------------------------------------
+    def _acquire(self, key):
+        pid = str(os.getpid())
+        with self._registry() as registry:
+            entry = registry.get(key)
+            if entry is None or not all(path.exists() for path in self._paths(key)):
+                registry.pop(key, None)
+                return False
+            entry["refs"][pid] = entry["refs"].get(pid, 0) + 1
+            entry["last_used"] = time.time()
+
+        return True
+
+    def _release(self, key):
+        pid = str(os.getpid())
+        with self._registry() as registry:
+            entry = registry.get(key)
+            if entry is not None and entry["refs"].get(pid, 0) > 0:
+                entry["refs"][pid] -= 1
+            self._evict(registry)
+
+    # ---------------------------------------------------------------------------
+    # Writes a factorization and registers it with one reference held
+    # ---------------------------------------------------------------------------
+    def _publish(self, key, lu, piv):
+        for path, array in zip(self._paths(key), (lu, piv)):
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(tmp, "wb") as file:
+                np.save(file, array)
+            os.replace(tmp, path)
+
+        pid = str(os.getpid())
+        with self._registry() as registry:
+            entry = registry.setdefault(key, {"nbytes": int(lu.nbytes + piv.nbytes), "refs": {}})
+            entry["refs"][pid] = entry["refs"].get(pid, 0) + 1
+            entry["last_used"] = time.time()
+            self._evict(registry)
+
+    def _evict(self, registry):
+        total = sum(entry["nbytes"] for entry in registry.values())
+        for key in sorted(registry, key=lambda k: registry[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if registry[key]["refs"]:
+                continue
+            total -= registry.pop(key)["nbytes"]
+            for path in self._paths(key):
+                path.unlink(missing_ok=True)
+
+    # ---------------------------------------------------------------------------
+    # Yields the (lu, piv) factorization of A for the geometry (x, y), with lu
+    # a read-only memory map, factoring and publishing it first if no process
+    # on this host has done so. The reference is held until the block exits.
+    # 'progress' is called like hess_smith's between the steps of that
+    # factoring, so a caller can abort it by raising.
+    # ---------------------------------------------------------------------------
+    @contextmanager
+    def attach(self, x, y, progress=None):
+        key = geometry_key(x, y)
+
+        if not self._acquire(key):
+            npanel = len(x) - 1
+            l, sin_theta, cos_theta, xbar, ybar = panel_geometry(x, y, npanel)
+            if progress:
+                progress(0.05)
+            A = infl_coeff(x, y, xbar, ybar, sin_theta, cos_theta, npanel, ASSEMBLY_BLOCK_ROWS)
+            if progress:
+                progress(0.45)
+            lu, piv = factor_influence_matrix(A, overwrite=True)
+            del A
+            self._publish(key, lu, piv)
+
+        try:
+            lu_path, piv_path = self._paths(key)
+            # the pivots are only N ints, and scipy's lu_solve crashes on a
+            # read-only memory-mapped pivot array, so only lu stays mapped
+            yield np.load(lu_path, mmap_mode="r"), np.load(piv_path)
+        finally:
+            self._release(key)
+
+    # ---------------------------------------------------------------------------
+    # Number of entries, total bytes and references held, for diagnostics
+    # ---------------------------------------------------------------------------
+    def stats(self):
+        with self._registry() as registry:
+            return {
+                "entries": len(registry),
+                "bytes": sum(entry["nbytes"] for entry in registry.values()),
+                "refs": sum(sum(entry["refs"].values()) for entry in registry.values()),
+            }
+
+    def clear(self):
+        with self._registry() as registry:
+            for key in [key for key, entry in registry.items() if not entry["refs"]]:
+                registry.pop(key)
+                for path in self._paths(key):
+                    path.unlink(missing_ok=True)
@@ -0,0 +1,170 @@
+import os
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from hess_smith_panel_method import SOLVER_VERSION, naca_4series_generator, hess_smith_sweep, pm
+
+#################################################################################
+## Persistent store of panel method results shared by every session and the
+## command line, keyed by (naca, npanel, alpha, solver version).
+##
+## Cl/Cd/Cm are plain columns and cp is a float32 blob; xbar is not stored since
+## it follows from (naca, npanel). The primary key is the lookup index.
+#################################################################################
+
+STORE_PATH = os.environ.get("POLAR_STORE_PATH", str(Path(__file__).resolve().parent / "polars.sqlite"))
+
+COMMON_AIRFOILS = ["0006", "0009", "0012", "0015", "0018", "0021", "1408", "1410", "1412",
+                   "2408", "2410", "2412", "2415", "2418", "2421", "4412", "4415", "4418",
+                   "4421", "6409", "6412"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS polars (
+    naca    TEXT    NOT NULL,
+    npanel  INTEGER NOT NULL,
+    alpha   REAL    NOT NULL,
+    version TEXT    NOT NULL,
+    cl      REAL    NOT NULL,
+    cd      REAL    NOT NULL,
+    cm      REAL    NOT NULL,
+    cp      BLOB    NOT NULL,
+    PRIMARY KEY (naca, npanel, alpha, version)
+) WITHOUT ROWID
+"""
+
+
+def _alpha_key(alpha):
+    return round(float(alpha), 4)
+
+
+def _naca_key(naca):
+    return "".join(str(int(d)) for d in naca)
+
+
+def _xbar(naca, npanel):
+    x, y = naca_4series_generator([int(d) for d in naca], npanel)
+
+    return (x[1:] + x[:-1]) / 2
+
+
+class PolarStore:
+
+    def __init__(self, path=STORE_PATH):
+        self.path = str(path)
+        self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(_SCHEMA)
+
+    # ---------------------------------------------------------------------------
+    # Returns (cl, cd, cm, xbar, cp) like pm, or None when not stored
+    # ---------------------------------------------------------------------------
+    def get(self, naca, npanel, alpha):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT cl, cd, cm, cp FROM polars WHERE naca = ? AND npanel = ? AND alpha = ? AND version = ?",
+                (_naca_key(naca), int(npanel), _alpha_key(alpha), SOLVER_VERSION)).fetchone()
+        if row is None:
+            return None
+        cl, cd, cm, cp = row
+
+        return cl, cd, cm, _xbar(naca, npanel), np.frombuffer(cp, dtype=np.float32).astype(np.float64)
+
+    def put(self, naca, npanel, alpha, result):
+        cl, cd, cm, xbar, cp = result
+        self.put_many(naca, npanel, [alpha], [cl], [cd], [cm], [cp])
+
+    # ---------------------------------------------------------------------------
+    # Bulk insert of K results for one airfoil (cp has shape (K, npanel))
+    # ---------------------------------------------------------------------------
+    def put_many(self, naca, npanel, alphas, cl, cd, cm, cp):
+        naca = _naca_key(naca)
+        rows = [(naca, int(npanel), _alpha_key(a), SOLVER_VERSION, float(l), float(d), float(m),
+                 np.asarray(c, dtype=np.float32).tobytes())
+                for a, l, d, m, c in zip(alphas, cl, cd, cm, cp)]
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO polars VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    # ---------------------------------------------------------------------------
+    # Stored result if there is one, otherwise solve with pm and store it
+    # ---------------------------------------------------------------------------
+    def solve(self, alpha, naca, npanel):
+        result = self.get(naca, npanel, alpha)
+        if result is None:
+            result = pm(alpha, [int(d) for d in naca], npanel)
+            self.put(naca, npanel, alpha, result)
+
+        return result
+
+    # ---------------------------------------------------------------------------
+    # Fills the store for every airfoil over an alpha sweep, skipping angles
+    # that are already stored (one factorization per airfoil)
+    # ---------------------------------------------------------------------------
+    def populate(self, nacas, npanel, alphas):
+        added = 0
+        for naca in nacas:
+            missing = [a for a in alphas if self.get(naca, npanel, a) is None]
+            if not missing:
+                continue
+            x, y = naca_4series_generator([int(d) for d in naca], npanel)
+            cl, cd, cm, cp, *_ = hess_smith_sweep(x, y, missing)
+            self.put_many(naca, npanel, missing, cl, cd, cm, cp)
+            added += len(missing)
+
+        return added
+
+    def count(self):
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM polars WHERE version = ?", (SOLVER_VERSION,)).fetchone()[0]
+
+    def close(self):
+        self._connection.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    # -------------------------------------------------------------------------------
+    #  python polar_store.py solve 2412 4 --npanel 200
+    #  python polar_store.py populate --npanel 200 --alphas -4 12 1 [--naca 0012 2412]
+    # -------------------------------------------------------------------------------
+    parser = argparse.ArgumentParser(description="Stored Hess-Smith panel method results")
+    parser.add_argument("--store", default=STORE_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    solve = commands.add_parser("solve", help="look up (or solve and store) one case")
+    solve.add_argument("naca")
+    solve.add_argument("alpha", type=float)
+    solve.add_argument("--npanel", type=int, default=200)
+
+    populate = commands.add_parser("populate", help="pre-compute polars for common airfoils")
+    populate.add_argument("--naca", nargs="+", default=COMMON_AIRFOILS)
+    populate.add_argument("--npanel", type=int, default=200)
+    populate.add_argument("--alphas", nargs=3, type=float, default=[-4.0, 12.0, 0.5],
+                          metavar=("START", "STOP", "STEP"))
+    args = parser.parse_args()
+
+    store = PolarStore(args.store)
+    t0 = time.perf_counter()
+    if args.command == "solve":
+        stored = store.get(args.naca, args.npanel, args.alpha) is not None
+        cl, cd, cm, xbar, cp = store.solve(args.alpha, args.naca, args.npanel)
+        print(f"NACA {args.naca}, alpha = {args.alpha}, {args.npanel} panels"
+              f" ({'stored' if stored else 'solved'} in {time.perf_counter() - t0:.4f} s)")
+        print('Cl: ', cl)
+        print('Cd: ', cd)
+        print('Cm: ', cm)
+    else:
+        start, stop, step = args.alphas
+        alphas = np.arange(start, stop + step / 2, step)
+        added = store.populate(args.naca, args.npanel, alphas)
+        print(f"{added} results added in {time.perf_counter() - t0:.2f} s, {store.count()} stored")
+    store.close()
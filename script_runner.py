@@ -0,0 +1,289 @@
+import ast
+import builtins
+import contextlib
+import io
+import os
+import queue
+import resource
+import runpy
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from multiprocessing.connection import Connection
+from pathlib import Path
+
+#################################################################################
+## Runs the showcased scripts for visitors of the Streamlit app.
+##
+## A few worker processes start once and import numpy, scipy, matplotlib and
+## sympy up front, so a run only pays for the script itself. Workers are plain
+## subprocesses talking over a socketpair: a multiprocessing spawn child would
+## first re-run the Streamlit script it was started from. Each job:
+##   - answers the script's input() prompts, in order, from the visitor's values
+##     (prompts are found with ast, so the app can show one widget per prompt)
+##   - runs in a scratch directory with stdout captured and plt.show() a no-op;
+##     every open figure comes back as a PNG
+##   - is limited in CPU time, address space and file size with rlimits, and
+##     in wall time by the parent, which kills the worker and starts a fresh one
+## Only the whitelisted scripts can be run.
+#################################################################################
+
+SCRIPTS_DIR = Path(__file__).resolve().parent / "scripts"
+
+# runnable scripts and the default answers to their prompts
+RUNNABLE_SCRIPTS = {
+    "hess_smith_panel_method_uinputs.py": ("2412", 4, 200),
+    "naca_4series_geoplotter.py": ("2412",),
+}
+
+PRELOAD_MODULES = ("numpy", "scipy.linalg", "matplotlib.pyplot", "sympy")
+
+TIME_LIMIT = 30
+
+MEMORY_LIMIT = 1024 * 2 ** 20
+
+FILE_SIZE_LIMIT = 16 * 2 ** 20
+
+STDOUT_LIMIT = 64 * 2 ** 10
+
+
+class ScriptError(Exception):
+    pass
+
+
+#################################################################################
+## input() prompts of a script, in source order, as (prompt, kind) with kind
+## "int" or "float" when the call is wrapped in int()/float() and "str" otherwise
+#################################################################################
+
+def script_prompts(path):
+    tree = ast.parse(Path(path).read_text(), filename=str(path))
+    prompts = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Name):
+            continue
+        args = [node.args[0]] if node.args else []
+        if node.func.id in ("int", "float") and args and _is_input(args[0]):
+            prompts.append((args[0], node.func.id))
+        elif _is_input(node) and all(node is not inner for inner, kind in prompts):
+            prompts.append((node, "str"))
+
+    prompts.sort(key=lambda item: (item[0].lineno, item[0].col_offset))
+
+    return [(_prompt_text(call), kind) for call, kind in prompts]
+
+
+def _is_input(node):
+    return isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "input"
+
+
+def _prompt_text(call):
+    if call.args and isinstance(call.args[0], ast.Constant) and isinstance(call.args[0].value, str):
+        return call.args[0].value.strip()
+
+    return "Input"
+
+
+#################################################################################
+## Runs in a worker process
+#################################################################################
+
+def _set_limit(limit, soft):
+    hard = resource.getrlimit(limit)[1]
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    try:
+        resource.setrlimit(limit, (soft, hard))
+    except (ValueError, OSError):
+        pass
+
+
+def _address_space():
+    with open("/proc/self/statm", "r") as file:
+        return int(file.read().split()[0]) * resource.getpagesize()
+
+
+def _run_job(path, answers, time_limit, memory_limit):
+    import matplotlib.pyplot as plt
+
+    answers = [str(answer) for answer in answers]
+    stdout = io.StringIO()
+    workdir = tempfile.mkdtemp(prefix="script_run_")
+    cwd = os.getcwd()
+    real_input = builtins.input
+    real_show = plt.show
+
+    def scripted_input(prompt=""):
+        if not answers:
+            raise ScriptError(f"no value given for prompt {prompt!r}")
+        answer = answers.pop(0)
+        print(f"{prompt}{answer}")
+        return answer
+
+    # ---------------------------------------------------------------------------
+    # STEP 1: limits for this job only (the soft limits are raised again after)
+    # ---------------------------------------------------------------------------
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _set_limit(resource.RLIMIT_CPU, int(usage.ru_utime + usage.ru_stime) + time_limit + 1)
+    _set_limit(resource.RLIMIT_AS, _address_space() + memory_limit)
+
+    # ---------------------------------------------------------------------------
+    # STEP 2: run the script as __main__
+    # ---------------------------------------------------------------------------
+    error = None
+    t0 = time.perf_counter()
+    builtins.input = scripted_input
+    plt.show = lambda *args, **kwargs: None
+    os.chdir(workdir)
+    try:
+        with contextlib.redirect_stdout(stdout):
+            runpy.run_path(str(path), run_name="__main__")
+    except MemoryError:
+        error = "The script ran out of memory."
+    except BaseException:
+        error = traceback.format_exc(limit=-3)
+    finally:
+        seconds = time.perf_counter() - t0
+        os.chdir(cwd)
+        builtins.input = real_input
+        plt.show = real_show
+        _set_limit(resource.RLIMIT_CPU, resource.RLIM_INFINITY)
+        _set_limit(resource.RLIMIT_AS, resource.RLIM_INFINITY)
+
+    # ---------------------------------------------------------------------------
+    # STEP 3: collect the figures
+    # ---------------------------------------------------------------------------
+    figures = []
+    for number in plt.get_fignums():
+        buffer = io.BytesIO()
+        plt.figure(number).savefig(buffer, format="png", dpi=80)
+        figures.append(buffer.getvalue())
+    plt.close("all")
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    return {"stdout": stdout.getvalue()[-STDOUT_LIMIT:], "figures": figures, "error": error, "seconds": seconds}
+
+
+def _worker_main(connection, file_size_limit):
+    # single-threaded BLAS so a job's CPU limit covers all of its work
+    os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    os.environ["MPLBACKEND"] = "Agg"
+    for module in PRELOAD_MODULES:
+        __import__(module)
+    _set_limit(resource.RLIMIT_FSIZE, file_size_limit)
+    try:
+        connection.send("ready")
+    except OSError:
+        # the app went away while this worker was importing
+        return
+
+    while True:
+        try:
+            job = connection.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        connection.send(_run_job(*job))
+
+
+#################################################################################
+## Pool of pre-warmed workers, one instance per Streamlit server process
+#################################################################################
+
+class ScriptRunner:
+
+    def __init__(self, workers=2, time_limit=TIME_LIMIT, memory_limit=MEMORY_LIMIT):
+        self.time_limit = time_limit
+        self.memory_limit = memory_limit
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = set()
+        self._ready = set()
+        self._closed = False
+        for _ in range(workers):
+            self._idle.put(self._spawn())
+
+    def _spawn(self):
+        parent, child = socket.socketpair()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "script_runner", str(child.fileno())],
+            cwd=Path(__file__).resolve().parent, pass_fds=(child.fileno(),),
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+        child.close()
+        worker = (process, Connection(parent.detach()))
+        with self._lock:
+            self._workers.add(worker)
+
+        return worker
+
+    def _retire(self, worker):
+        process, connection = worker
+        with self._lock:
+            self._workers.discard(worker)
+            self._ready.discard(process.pid)
+        process.kill()
+        process.wait()
+        connection.close()
+
+    def _started(self, connection):
+        try:
+            return connection.poll(120) and connection.recv() == "ready"
+        except (EOFError, OSError):
+            return False
+
+    # ---------------------------------------------------------------------------
+    # Runs a whitelisted script with the given prompt answers. Returns a dict
+    # with "stdout", "figures" (PNG bytes), "error" (None or a message) and
+    # "seconds". Blocks while every worker is busy. Raises ScriptError when the
+    # worker fails rather than the script (it did not start, or hit the time
+    # or memory limit), so such a failure is never cached as the script's result.
+    # ---------------------------------------------------------------------------
+    def run(self, script, answers):
+        if script not in RUNNABLE_SCRIPTS:
+            raise ValueError(f"{script} is not a runnable script")
+
+        worker = self._idle.get()
+        process, connection = worker
+        try:
+            # a freshly started worker may still be importing
+            if process.pid not in self._ready:
+                if not self._started(connection):
+                    raise ScriptError("The script runner failed to start.")
+                self._ready.add(process.pid)
+
+            connection.send((SCRIPTS_DIR / script, list(answers), self.time_limit, self.memory_limit))
+            if connection.poll(self.time_limit + 5):
+                result = connection.recv()
+                self._idle.put(worker)
+                return result
+            error = ScriptError(f"The script did not finish within {self.time_limit} s.")
+        except ScriptError as startup_error:
+            error = startup_error
+        except (EOFError, OSError):
+            error = ScriptError("The script exceeded its time or memory limit.")
+
+        # the worker is stuck or dead: replace it
+        self._retire(worker)
+        if not self._closed:
+            self._idle.put(self._spawn())
+
+        raise error
+
+    def shutdown(self):
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            self._retire(worker)
+
+
+if __name__ == "__main__":
+    # worker process started by ScriptRunner._spawn
+    _worker_main(Connection(int(sys.argv[1])), FILE_SIZE_LIMIT)
@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+from scipy.interpolate import CubicSpline
+from hess_smith_panel_method import hess_smith_sweep
+
+#################################################################################
+## Import of arbitrary airfoil coordinate files (Selig or Lednicer .dat) and a
+## local airfoil database built from them.
+##
+## Every airfoil is repaneled once to the same number of panels and stored as
+## one row of a single (n_airfoils, 2, npanel+1) .npy file, opened memory-mapped.
+## A JSON index holds the names and metadata, so lookups and batch runs over
+## the whole library never touch the original text files again.
+##
+## Each build writes its coordinates to a new coords.<hash>.npy named in the
+## index, so replacing index.json is the single step that switches a reader
+## from one build to the next. The previous build's array is kept for readers
+## that are between reading the index and opening it.
+#################################################################################
+
+COORDS_FILE = "coords.{}.npy"
+INDEX_FILE = "index.json"
+
+
+#################################################################################
+## Reads a Selig or Lednicer .dat file. Returns the title line and the raw
+## coordinates in solver order: lower trailing edge -> leading edge -> upper
+## trailing edge (the same order as naca_4series_generator).
+#################################################################################
+
+def read_airfoil_dat(path):
+    with open(path, "r", errors="replace") as file:
+        lines = file.read().splitlines()
+
+    # ---------------------------------------------------------------------------
+    # STEP 1: title, then every line that holds two numbers
+    # ---------------------------------------------------------------------------
+    title = lines[0].strip() if lines else Path(path).stem
+    pairs = []
+    for line in lines[1:]:
+        parts = line.replace(",", " ").split()
+        if len(parts) < 2:
+            continue
+        try:
+            pairs.append((float(parts[0]), float(parts[1])))
+        except ValueError:
+            continue
+    data = np.array(pairs)
+    if len(data) < 5:
+        raise ValueError(f"{path}: not enough coordinate pairs")
+
+    # ---------------------------------------------------------------------------
+    # STEP 2: Lednicer files start with the point counts of each surface and list
+    #         both surfaces from leading edge to trailing edge
+    # ---------------------------------------------------------------------------
+    if data[0, 0] > 1.5 and data[0, 1] > 1.5:
+        nu, nl = int(data[0, 0]), int(data[0, 1])
+        upper = data[1:1 + nu]
+        lower = data[1 + nu:1 + nu + nl]
+        xy = np.concatenate([lower[::-1], upper[1:] if np.allclose(upper[0], lower[0]) else upper])
+
+    # ---------------------------------------------------------------------------
+    # STEP 3: Selig files run upper trailing edge -> leading edge -> lower
+    # ---------------------------------------------------------------------------
+    else:
+        xy = data[::-1]
+
+    return title, xy[:, 0].copy(), xy[:, 1].copy()
+
+
+#################################################################################
+## Repanels a raw contour to npanel panels with cosine spacing in arc length on
+## each surface (clustered at the leading and trailing edges), interpolating the
+## contour with a cubic spline in arc length.
+#################################################################################
+
+def repanel(x, y, npanel):
+    if npanel % 2 != 0:
+        raise ValueError("Please choose an even number of panels!")
+
+    # ---------------------------------------------------------------------------
+    # STEP 1: arc length along the contour, dropping repeated points
+    # ---------------------------------------------------------------------------
+    ds = np.hypot(np.diff(x), np.diff(y))
+    keep = np.concatenate([[True], ds > 1e-12])
+    x, y = x[keep], y[keep]
+    s = np.concatenate([[0.0], np.cumsum(np.hypot(np.diff(x), np.diff(y)))])
+
+    # ---------------------------------------------------------------------------
+    # STEP 2: cosine spacing on each side of the leading edge (minimum x point)
+    # ---------------------------------------------------------------------------
+    s_le = s[np.argmin(x)]
+    nside = npanel // 2 + 1
+    frac = (1 - np.cos(np.linspace(0, np.pi, nside))) / 2
+    s_new = np.concatenate([s_le * frac, s_le + (s[-1] - s_le) * frac[1:]])
+
+    # ---------------------------------------------------------------------------
+    # STEP 3: evaluate the spline of the contour at the new arc lengths
+    # ---------------------------------------------------------------------------
+    spline = CubicSpline(s, np.column_stack([x, y]))
+    xy = spline(s_new)
+
+    return xy[:, 0], xy[:, 1]
+
+
+#################################################################################
+## Maximum thickness, maximum camber and their chordwise positions
+#################################################################################
+
+def section_properties(x, y):
+    npanel = len(x) - 1
+    le = npanel // 2
+    xl, yl = x[le::-1], y[le::-1]
+    xu, yu = x[le:], y[le:]
+
+    y_lower = np.interp(xu, xl, yl)
+    thickness = yu - y_lower
+    camber = (yu + y_lower) / 2
+
+    return {
+        "thickness": float(thickness.max()), "x_thickness": float(xu[np.argmax(thickness)]),
+        "camber": float(camber[np.argmax(np.abs(camber))]), "x_camber": float(xu[np.argmax(np.abs(camber))]),
+    }
+
+
+#################################################################################
+## Parses and repanels every .dat file in dat_dir and writes the database to
+## db_dir. Files that cannot be parsed, or whose case-insensitive name clashes
+## with an earlier file's, are skipped and returned with the reason.
+#################################################################################
+
+def build_airfoil_database(dat_dir, db_dir, npanel=160):
+    db_dir = Path(db_dir)
+    db_dir.mkdir(parents=True, exist_ok=True)
+    paths = sorted(Path(dat_dir).glob("*.dat"), key=lambda p: p.name.lower())
+
+    # ---------------------------------------------------------------------------
+    # STEP 1: parse and repanel every file
+    # ---------------------------------------------------------------------------
+    rows = []
+    entries = []
+    failed = {}
+    seen = {}
+    for path in paths:
+        # names are case-insensitive, so 'NACA0012.dat' and 'naca0012.dat' collide
+        name = path.stem.lower()
+        if name in seen:
+            failed[path.name] = f"duplicate of {seen[name]}"
+            continue
+        try:
+            title, x, y = read_airfoil_dat(path)
+            x, y = repanel(x, y, npanel)
+        except Exception as error:
+            failed[path.name] = str(error)
+            continue
+        seen[name] = path.name
+        rows.append((x, y))
+        entries.append({"name": name, "title": title, "file": path.name, **section_properties(x, y)})
+
+    # ---------------------------------------------------------------------------
+    # STEP 2: one array file for all coordinates, then the index that names it
+    # ---------------------------------------------------------------------------
+    coords = np.array(rows, dtype=np.float64).reshape(len(rows), 2, npanel + 1)
+    coords_file = COORDS_FILE.format(hashlib.sha1(coords.tobytes()).hexdigest()[:16])
+    try:
+        with open(db_dir / INDEX_FILE, "r") as file:
+            previous = json.load(file).get("coords")
+    except (FileNotFoundError, json.JSONDecodeError):
+        previous = None
+
+    tmp = db_dir / (coords_file + ".tmp")
+    with open(tmp, "wb") as file:
+        np.save(file, coords)
+    os.replace(tmp, db_dir / coords_file)
+    tmp = db_dir / (INDEX_FILE + ".tmp")
+    with open(tmp, "w") as file:
+        json.dump({"npanel": npanel, "coords": coords_file, "airfoils": entries}, file, indent=1)
+    os.replace(tmp, db_dir / INDEX_FILE)
+
+    # ---------------------------------------------------------------------------
+    # STEP 3: drop the arrays of older builds
+    # ---------------------------------------------------------------------------
+    for path in db_dir.glob(COORDS_FILE.format("*")):
+        if path.name not in (coords_file, previous):
+            path.unlink(missing_ok=True)
+
+    return failed
+
+
+#################################################################################
+## Read-only view of a database written by build_airfoil_database
+#################################################################################
+
+class AirfoilDatabase:
+
+    def __init__(self, db_dir):
+        db_dir = Path(db_dir)
+        with open(db_dir / INDEX_FILE, "r") as file:
+            index = json.load(file)
+        self.npanel = index["npanel"]
+        self.entries = index["airfoils"]
+        self.rows = {entry["name"]: row for row, entry in enumerate(self.entries)}
+        self.coords = np.load(db_dir / index["coords"], mmap_mode="r")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, name):
+        return name.lower() in self.rows
+
+    @property
+    def names(self):
+        return list(self.rows)
+
+    def metadata(self, name):
+        return self.entries[self.rows[name.lower()]]
+
+    def coordinates(self, name):
+        x, y = self.coords[self.rows[name.lower()]]
+        return np.array(x), np.array(y)
+
+    # ---------------------------------------------------------------------------
+    # Cl, Cd, Cm of shape (n_airfoils, K) for K angles of attack, one
+    # factorization per airfoil
+    # ---------------------------------------------------------------------------
+    def batch_polar(self, alphas, names=None):
+        names = self.names if names is None else [name.lower() for name in names]
+        alphas = np.atleast_1d(alphas)
+        cl = np.zeros((len(names), len(alphas)))
+        cd = np.zeros((len(names), len(alphas)))
+        cm = np.zeros((len(names), len(alphas)))
+        for k, name in enumerate(names):
+            x, y = self.coordinates(name)
+            cl[k], cd[k], cm[k], *_ = hess_smith_sweep(x, y, alphas)
+
+        return names, cl, cd, cm
+
+
+if __name__ == "__main__":
+    import argparse
+
+    # -------------------------------------------------------------------------------
+    #  python airfoil_database.py <dat_dir> <db_dir> [--npanel 160]
+    # -------------------------------------------------------------------------------
+    parser = argparse.ArgumentParser(description="Build a local airfoil database from .dat files")
+    parser.add_argument("dat_dir")
+    parser.add_argument("db_dir")
+    parser.add_argument("--npanel", type=int, default=160)
+    args = parser.parse_args()
+
+    failed = build_airfoil_database(args.dat_dir, args.db_dir, args.npanel)
+    db = AirfoilDatabase(args.db_dir)
+    print(f'{len(db)} airfoils stored, {len(failed)} skipped')
+    for name, error in failed.items():
+        print(f'  {name}: {error}')
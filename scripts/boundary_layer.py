@@ -0,0 +1,270 @@
+import numpy as np
+from hess_smith_panel_method import naca_4series_generator, panel_geometry, hess_smith_sweep
+
+#################################################################################
+## Integral boundary-layer post-processor for the Hess-Smith surface velocity.
+##
+##   laminar:     Thwaites' method from the stagnation point
+##   transition:  Michel's criterion, or laminar separation (lambda < -0.09)
+##   turbulent:   Head's entrainment method with Ludwieg-Tillmann skin friction
+##   drag:        Squire-Young at the trailing edge of each surface
+##
+## The drag estimate is only valid for attached flow: once a surface separates
+## its theta and H are frozen at separation, so Cd is NaN for solutions that
+## separate ahead of ATTACHED_TO.
+##
+## Both surfaces of every angle of attack are marched together: the upper and
+## lower surfaces of K solutions are stacked as 2K rows of padded arrays, so the
+## only Python loop is the march over surface stations.
+#################################################################################
+
+# shape factor at the start of turbulent flow
+H_TRANSITION = 1.4
+
+# turbulent separation when H exceeds this
+H_SEPARATION = 2.4
+
+# Cd is only given when both surfaces stay attached up to this x/c. Head's
+# method nearly always separates in the last few panels, where the inviscid
+# velocity drops steeply into the trailing edge; that barely changes theta.
+ATTACHED_TO = 0.95
+
+
+#################################################################################
+## Splits vt (K, npanel) at the stagnation point of each row into 2K surfaces
+## starting at the stagnation point: rows 0..K-1 upper, rows K..2K-1 lower.
+## Returns arc length s, edge velocity ue, panel index and station count per row.
+#################################################################################
+
+def split_surfaces(vt, l):
+    vt = np.atleast_2d(vt)
+    K, npanel = vt.shape
+
+    # ---------------------------------------------------------------------------
+    # STEP 1: stagnation point between the last vt < 0 and the first vt >= 0 panel
+    # ---------------------------------------------------------------------------
+    s_mid = np.cumsum(l) - l / 2
+    ks = np.argmax(vt >= 0, axis=1)
+    if np.any(ks == 0):
+        raise ValueError("No stagnation point found on the lower surface")
+    rows = np.arange(K)
+    v0 = vt[rows, ks - 1]
+    v1 = vt[rows, ks]
+    s_stag = s_mid[ks - 1] + (s_mid[ks] - s_mid[ks - 1]) * (-v0) / (v1 - v0)
+
+    # ---------------------------------------------------------------------------
+    # STEP 2: panel index of every station, walking away from the stagnation point
+    # ---------------------------------------------------------------------------
+    j = np.arange(npanel)
+    idx = np.concatenate([ks[:, np.newaxis] + j, ks[:, np.newaxis] - 1 - j])
+    count = np.concatenate([npanel - ks, ks])
+    valid = j < count[:, np.newaxis]
+    idx = np.where(valid, idx, np.where(np.arange(2 * K) < K, npanel - 1, 0)[:, np.newaxis])
+
+    # ---------------------------------------------------------------------------
+    # STEP 3: arc length and edge velocity (padding repeats the last station)
+    # ---------------------------------------------------------------------------
+    sign = np.concatenate([np.ones(K), -np.ones(K)])[:, np.newaxis]
+    vt2 = np.concatenate([vt, vt])
+    s = sign * (s_mid[idx] - np.concatenate([s_stag, s_stag])[:, np.newaxis])
+    ue = sign * np.take_along_axis(vt2, idx, axis=1)
+
+    return s, ue, idx, count
+
+
+#################################################################################
+## Thwaites' laminar correlations (Cebeci-Bradshaw fits): returns H, l(lambda)
+#################################################################################
+
+def thwaites_correlations(lam):
+    lam = np.clip(lam, -0.09, 0.25)
+    H = np.where(lam >= 0, 2.61 - 3.75 * lam + 5.24 * lam ** 2, 2.088 + 0.0731 / (lam + 0.14))
+    l = np.where(lam >= 0, 0.22 + 1.57 * lam - 1.8 * lam ** 2, 0.22 + 1.402 * lam + 0.018 * lam / (lam + 0.107))
+
+    return H, l
+
+
+#################################################################################
+## Head's shape factor relations H1(H) and H(H1), entrainment F(H1) and the
+## Ludwieg-Tillmann skin friction
+#################################################################################
+
+def head_h1(H):
+    return np.where(H <= 1.6, 3.3 + 0.8234 * (H - 1.1) ** -1.287, 3.3 + 1.5501 * (H - 0.6778) ** -3.064)
+
+
+def head_h(H1):
+    H1 = np.maximum(H1, 3.32)
+    return np.where(H1 >= 5.3, 1.1 + 0.86 * (H1 - 3.3) ** -0.777, 0.6778 + 1.1538 * (H1 - 3.3) ** -0.326)
+
+
+def head_entrainment(H1):
+    return 0.0306 * np.maximum(H1 - 3.0, 1e-3) ** -0.6169
+
+
+def ludwieg_tillmann(H, re_theta):
+    return 0.246 * 10 ** (-0.678 * H) * np.maximum(re_theta, 1.0) ** -0.268
+
+
+#################################################################################
+## Marches the boundary layer over every row of (s, ue) and returns the momentum
+## thickness, shape factor and skin friction at each station, the transition
+## station per row and the turbulent separation station per row (count when
+## the row stays attached)
+#################################################################################
+
+def march_boundary_layer(s, ue, count, reynolds):
+    nrow, nmax = s.shape
+    rows = np.arange(nrow)
+    valid = np.arange(nmax) < count[:, np.newaxis]
+    nu = 1 / reynolds
+
+    # ---------------------------------------------------------------------------
+    # STEP 1: Thwaites for the whole surface, theta^2 = 0.45 nu / ue^6 int ue^5 ds
+    #         (the first interval from the stagnation point assumes linear ue)
+    # ---------------------------------------------------------------------------
+    ue = np.maximum(ue, 1e-6)
+    ds = np.diff(s, axis=1, prepend=0.0) * valid
+    ue5 = ue ** 5
+    ue5_prev = np.concatenate([np.zeros((nrow, 1)), ue5[:, :-1]], axis=1)
+    integral = np.cumsum(0.5 * (ue5 + ue5_prev) * ds, axis=1)
+    integral -= (0.5 - 1 / 6) * ue5[:, :1] * ds[:, :1]
+    theta = np.sqrt(0.45 * nu * integral / ue ** 6)
+
+    due_ds = np.gradient(ue, axis=1) / np.maximum(np.gradient(s, axis=1), 1e-12)
+    lam = theta ** 2 * due_ds / nu
+    H, l = thwaites_correlations(lam)
+    re_theta = ue * theta * reynolds
+    cf = 2 * l / np.maximum(re_theta, 1e-12)
+
+    # ---------------------------------------------------------------------------
+    # STEP 2: transition station (Michel, or laminar separation)
+    # ---------------------------------------------------------------------------
+    re_x = np.maximum(ue * s * reynolds, 1.0)
+    michel = re_theta > 1.174 * (1 + 22400 / re_x) * re_x ** 0.46
+    tripped = (michel | (lam < -0.09)) & valid
+    tripped[:, 0] = False
+    transition = np.where(tripped.any(axis=1), np.argmax(tripped, axis=1), count)
+
+    # ---------------------------------------------------------------------------
+    # STEP 3: Head's method downstream of transition, all rows together
+    #         (Heun steps in theta and Y = ue theta H1)
+    # ---------------------------------------------------------------------------
+    separated = np.zeros(nrow, dtype=bool)
+    separation = count.copy()
+    th = theta[rows, np.minimum(transition, nmax - 1)]
+    Y = ue[rows, np.minimum(transition, nmax - 1)] * th * head_h1(H_TRANSITION)
+
+    def rates(th, Y, ue_j, due_j):
+        H1 = Y / (ue_j * th)
+        Hj = head_h(H1)
+        cfj = ludwieg_tillmann(Hj, ue_j * th * reynolds)
+        return cfj / 2 - (Hj + 2) * th / ue_j * due_j, ue_j * head_entrainment(H1), Hj, cfj
+
+    for j in range(1, nmax):
+        march = (j > transition) & (j < count) & ~separated
+        if not march.any():
+            continue
+        h = s[march, j] - s[march, j - 1]
+        th0, Y0 = th[march], Y[march]
+        k1_th, k1_Y, _, _ = rates(th0, Y0, ue[march, j - 1], due_ds[march, j - 1])
+        k2_th, k2_Y, _, _ = rates(th0 + h * k1_th, Y0 + h * k1_Y, ue[march, j], due_ds[march, j])
+        th[march] = th0 + 0.5 * h * (k1_th + k2_th)
+        Y[march] = Y0 + 0.5 * h * (k1_Y + k2_Y)
+
+        _, _, Hj, cfj = rates(th[march], Y[march], ue[march, j], due_ds[march, j])
+        theta[march, j] = th[march]
+        H[march, j] = Hj
+        cf[march, j] = cfj
+
+        new_sep = np.flatnonzero(march)[Hj > H_SEPARATION]
+        separated[new_sep] = True
+        separation[new_sep] = j
+
+    # ---------------------------------------------------------------------------
+    # STEP 4: separated rows keep their separation values to the trailing edge
+    # ---------------------------------------------------------------------------
+    sep = np.minimum(separation, nmax - 1)[:, np.newaxis]
+    downstream = np.arange(nmax) > sep
+    theta = np.where(downstream, np.take_along_axis(theta, sep, axis=1), theta)
+    H = np.where(downstream, np.take_along_axis(H, sep, axis=1), H)
+    cf = np.where(downstream, 0.0, cf)
+
+    return theta, H, cf, transition, separation
+
+
+#################################################################################
+## Viscous drag from the surface velocity of K solutions. Returns Cd (K,) from
+## Squire-Young summed over both surfaces (NaN where either surface separates
+## ahead of ATTACHED_TO), and the transition and separation x/c on the upper
+## and lower surface of each solution (x/c = 1 when attached).
+#################################################################################
+
+def boundary_layer(vt, x, y, reynolds):
+    npanel = len(x) - 1
+    l, sin_theta, cos_theta, xbar, ybar = panel_geometry(x, y, npanel)
+    vt = np.atleast_2d(vt)
+    K = vt.shape[0]
+
+    # ---------------------------------------------------------------------------
+    # STEP 1: march both surfaces of every solution
+    # ---------------------------------------------------------------------------
+    s, ue, idx, count = split_surfaces(vt, l)
+    theta, H, cf, transition, separation = march_boundary_layer(s, ue, count, reynolds)
+
+    # ---------------------------------------------------------------------------
+    # STEP 2: Squire-Young at the last station of each surface
+    # ---------------------------------------------------------------------------
+    rows = np.arange(2 * K)
+    te = count - 1
+    ue_te = np.maximum(ue[rows, te], 1e-6)
+    cd_surface = 2 * theta[rows, te] * ue_te ** ((H[rows, te] + 5) / 2)
+    cd = cd_surface[:K] + cd_surface[K:]
+
+    # ---------------------------------------------------------------------------
+    # STEP 3: transition location (x/c = 1 when the surface stays laminar) and
+    #         separation location (x/c = 1 when it stays attached)
+    # ---------------------------------------------------------------------------
+    x_tr = np.where(transition < count, xbar[idx[rows, np.minimum(transition, te)]], 1.0)
+    x_sep = np.where(separation < count, xbar[idx[rows, np.minimum(separation, te)]], 1.0)
+
+    # Squire-Young on values frozen well ahead of the trailing edge is meaningless
+    cd = np.where(np.minimum(x_sep[:K], x_sep[K:]) < ATTACHED_TO, np.nan, cd)
+
+    return cd, x_tr[:K], x_tr[K:], x_sep[:K], x_sep[K:]
+
+
+#################################################################################
+## EXAMPLE IMPLEMENTATION: inviscid sweep and drag polar in one pass. Cd is
+## NaN at angles where xsep_upper or xsep_lower is ahead of ATTACHED_TO.
+#################################################################################
+
+def viscous_polar(naca_list, npanel, alphas, reynolds):
+    x, y = naca_4series_generator(naca_list, npanel)
+    cl, cd_p, cm, cp, xbar, ybar, vt, ct, st = hess_smith_sweep(x, y, alphas)
+    cd, xtr_upper, xtr_lower, xsep_upper, xsep_lower = boundary_layer(vt, x, y, reynolds)
+
+    return cl, cd, cm, xtr_upper, xtr_lower, xsep_upper, xsep_lower
+
+
+if __name__ == "__main__":
+    import time
+    import matplotlib.pyplot as plt
+
+    # -------------------------------------------------------------------------------
+    #  NACA 2412 airfoil, 200 panels, Re = 3e6, AoA = -4 to 10 deg.
+    # -------------------------------------------------------------------------------
+    alphas = np.linspace(-4, 10, 29)
+    t0 = time.perf_counter()
+    cl, cd, cm, xtr_upper, xtr_lower, xsep_upper, xsep_lower = viscous_polar([2,4,1,2], 200, alphas, 3e6)
+    print(f'{len(alphas)} point polar: {time.perf_counter() - t0:.3f} s')
+    for a, c_l, c_d, xu, xl, su, sl in zip(alphas, cl, cd, xtr_upper, xtr_lower, xsep_upper, xsep_lower):
+        print(f'alpha = {a:5.1f}   Cl = {c_l:.4f}   Cd = {c_d:.5f}   xtr = {xu:.3f} / {xl:.3f}   xsep = {su:.3f} / {sl:.3f}')
+
+    fig = plt.figure(figsize=(12, 6), tight_layout=True)
+    plt.plot(cd, cl, 'b.-')
+    plt.xlabel('$c_d$')
+    plt.ylabel('$c_l$')
+    plt.title("Drag Polar")
+    plt.grid(True)
+    plt.show()
@@ -0,0 +1,133 @@
+import numpy as np
+import scipy.optimize as opt
+from hess_smith_panel_method import naca_4series_generator, hess_smith, aero_coeff
+
+#################################################################################
+## Subsonic compressibility corrections applied to one incompressible Hess-Smith
+## solution. The corrections are broadcast over a whole array of Mach numbers,
+## so a Mach sweep costs a few array operations instead of one panel solve per
+## Mach number.
+#################################################################################
+
+GAMMA = 1.4
+
+RULES = ("prandtl-glauert", "karman-tsien", "laitone")
+
+
+#################################################################################
+## Corrected pressure coefficient for every Mach number: returns (K, npanel) for
+## K Mach numbers and an incompressible cp of length npanel
+#################################################################################
+
+def compressibility_correction(cp, mach, rule="karman-tsien"):
+    cp = np.asarray(cp, dtype=float)[np.newaxis, :]
+    mach = np.atleast_1d(np.asarray(mach, dtype=float))[:, np.newaxis]
+    if np.any((mach < 0) | (mach >= 1)):
+        raise ValueError("Compressibility corrections only apply for 0 <= M < 1")
+    beta = np.sqrt(1 - mach ** 2)
+
+    if rule == "prandtl-glauert":
+        return cp / beta
+    elif rule == "karman-tsien":
+        return cp / (beta + mach ** 2 / (1 + beta) * cp / 2)
+    elif rule == "laitone":
+        return cp / (beta + mach ** 2 * (1 + (GAMMA - 1) / 2 * mach ** 2) / (2 * beta) * cp)
+    else:
+        raise ValueError(f"Unknown compressibility rule '{rule}', choose from {RULES}")
+
+
+#################################################################################
+## Pressure coefficient at which the local flow reaches M = 1
+#################################################################################
+
+def critical_pressure_coefficient(mach):
+    mach = np.asarray(mach, dtype=float)
+    ratio = (2 + (GAMMA - 1) * mach ** 2) / (GAMMA + 1)
+
+    return 2 / (GAMMA * mach ** 2) * (ratio ** (GAMMA / (GAMMA - 1)) - 1)
+
+
+#################################################################################
+## Freestream Mach number at which the corrected minimum cp equals the critical
+## cp. Scans a Mach grid for the first sign change, then refines with brentq.
+#################################################################################
+
+def critical_mach(cp_min, rule="karman-tsien"):
+    if cp_min >= 0:
+        return np.nan
+
+    def excess(mach):
+        return compressibility_correction([cp_min], mach, rule)[:, 0] - critical_pressure_coefficient(mach)
+
+    grid = np.linspace(0.01, 0.999, 400)
+    f = excess(grid)
+    # past a pole of the Karman-Tsien / Laitone denominator the values are meaningless
+    valid = np.cumprod(np.isfinite(f) & (np.abs(f) < 1e6)).astype(bool)
+    crossing = np.flatnonzero(valid[:-1] & valid[1:] & (f[:-1] > 0) & (f[1:] <= 0))
+    if len(crossing) == 0:
+        return np.nan
+    k = crossing[0]
+
+    return opt.brentq(lambda m: excess(np.array([m]))[0], grid[k], grid[k + 1], xtol=1e-10)
+
+
+#################################################################################
+## Applies one rule to an incompressible solution over an array of Mach numbers.
+## Returns the corrected cp (K, npanel), Cl, Cd, Cm arrays (K,), the critical
+## Mach number and a per-Mach flag for supercritical flow.
+#################################################################################
+
+def compressibility_sweep(x, y, cp, alpha, mach, rule="karman-tsien"):
+    npanel = len(x) - 1
+    mach = np.atleast_1d(np.asarray(mach, dtype=float))
+    al = alpha * np.pi / 180
+
+    # ---------------------------------------------------------------------------
+    # STEP 1: corrected cp for every Mach number at once
+    # ---------------------------------------------------------------------------
+    cp_m = compressibility_correction(cp, mach, rule)
+
+    # ---------------------------------------------------------------------------
+    # STEP 2: force coefficients for every Mach number at once
+    # ---------------------------------------------------------------------------
+    cl, cd, cm = aero_coeff(x, y, cp_m, al, npanel)
+
+    # ---------------------------------------------------------------------------
+    # STEP 3: critical Mach from the incompressible cp minimum
+    # ---------------------------------------------------------------------------
+    m_crit = critical_mach(np.min(cp), rule)
+    supercritical = mach >= m_crit if np.isfinite(m_crit) else np.zeros(len(mach), dtype=bool)
+
+    return cp_m, cl, cd, cm, m_crit, supercritical
+
+
+#################################################################################
+## EXAMPLE IMPLEMENTATION: one incompressible solve, every rule over a Mach sweep
+#################################################################################
+
+def pm_mach_sweep(alpha, naca_list, npanel, mach):
+    x, y = naca_4series_generator(naca_list, npanel)
+    cl, cd, cm, cp, xbar, ybar, vt, ct, st = hess_smith(x, y, alpha)
+
+    return {rule: compressibility_sweep(x, y, cp, alpha, mach, rule) for rule in RULES}
+
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    # -------------------------------------------------------------------------------
+    #  NACA 2412 airfoil, 200 panels, AoA = 2 deg., M = 0 to 0.8
+    # -------------------------------------------------------------------------------
+    mach = np.linspace(0, 0.8, 81)
+    sweep = pm_mach_sweep(2, [2,4,1,2], 200, mach)
+
+    fig = plt.figure(figsize=(12, 6), tight_layout=True)
+    for rule, (cp_m, cl, cd, cm, m_crit, supercritical) in sweep.items():
+        plt.plot(mach, cl, label=f'{rule} (M_crit = {m_crit:.3f})')
+        print(f'{rule:16s} M_crit: {m_crit:.4f}')
+    plt.xlabel('Mach Number')
+    plt.ylabel('$c_l$')
+    plt.title("Compressibility Corrected Lift Coefficient")
+    plt.legend()
+    plt.grid(True)
+    plt.show()
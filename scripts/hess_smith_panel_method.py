@@ -1,8 +1,18 @@
 import numpy as np
-import matplotlib.pyplot as plt
+import scipy.linalg as la
 import warnings
 warnings.simplefilter("ignore", category=DeprecationWarning)
 
+# bump whenever a change to the solver changes its results (stored polars are
+# keyed by this)
+SOLVER_VERSION = "2"
+
+# rows of A (and of the tangential velocity matrix) assembled per block
+ASSEMBLY_BLOCK_ROWS = 32
+
+# mixed precision mode: refinement step limit
+MIXED_MAX_REFINEMENTS = 10
+
 #################################################################################
 ## Generates a surface panelization of any NACA 4-series airfoil (with a
 ## bunching parameter for greater resolution at LE and TE)
@@ -12,8 +22,17 @@ def naca_4series_generator(naca4, npanel):
     # ---------------------------------------------------------------------------
     # STEP 2.1: naca airfoil digits
     # ---------------------------------------------------------------------------
-    x = np.zeros(npanel + 1)
-    y = np.zeros(npanel + 1)
+    m, p, t = naca_4series_params(naca4)
+
+    return naca_4series_shape(m, p, t, npanel)
+
+
+#################################################################################
+## Converts the four NACA digits into maximum camber, location of maximum camber
+## and thickness (all as fractions of chord)
+#################################################################################
+
+def naca_4series_params(naca4):
     n1 = int(naca4[3])
     n2 = int(naca4[2])
     n3 = int(naca4[1])
@@ -26,11 +45,26 @@ def naca_4series_generator(naca4, npanel):
     p = n3 / 10
     t = (n2 * 10 + n1) / 100
 
+    return m, p, t
+
+
+#################################################################################
+## Surface panelization for continuous NACA 4-series parameters (m, p, t), so the
+## shape can be varied smoothly by the sensitivity/optimization code
+#################################################################################
+
+def naca_4series_shape(m, p, t, npanel):
+    x = np.zeros(npanel + 1)
+    y = np.zeros(npanel + 1)
+
     # ---------------------------------------------------------------------------
     # STEP 2.3: compute thickness and camber distributions
     # ---------------------------------------------------------------------------
     if npanel % 2 != 0:
         raise ValueError("Please choose an even number of panels!")
+    if t <= 0:
+        # a zero thickness section has no area to put panels around
+        raise ValueError("Please choose an airfoil with a nonzero thickness!")
     nside = int(npanel / 2 + 1)
 
     # ---------------------------------------------------------------------------
@@ -110,188 +144,262 @@ def panel_geometry(x, y, npanel):
 
 
 #################################################################################
-## Computes the influence coefficient matrix 'A' for flow tangency boundary
-## condition and Kutta condition
+## Computes log(r_ij+1 / r_ij) and the subtended angle beta_ij between every
+## panel midpoint i and every panel j (broadcast over all i, j at once, or over
+## the midpoints selected by 'rows')
 #################################################################################
 
-def infl_coeff(x, y, xbar, ybar, st, ct, npanel):
+def influence_terms(x, y, xbar, ybar, npanel, rows=slice(None)):
+    # ---------------------------------------------------------------------------
+    # STEP 4.1 vectors from each midpoint (or only those in 'rows') to every
+    # panel node
+    # ---------------------------------------------------------------------------
+    rows = np.arange(npanel)[rows]
+    dx = x[np.newaxis, :] - xbar[rows, np.newaxis]
+    dy = y[np.newaxis, :] - ybar[rows, np.newaxis]
 
     # ---------------------------------------------------------------------------
-    # STEP 4.1 precompute common terms
+    # STEP 4.2 log(norm(r_ij+1) / norm(r_ij)) and beta_ij
     # ---------------------------------------------------------------------------
+    log_r = 0.5 * np.log(dx ** 2 + dy ** 2)
+    log_ratio = log_r[:, 1:] - log_r[:, :-1]
 
-    A = np.zeros((npanel + 1, npanel + 1))
+    dot_product = dx[:, :-1] * dx[:, 1:] + dy[:, :-1] * dy[:, 1:]
+    cross_product = dx[:, :-1] * dy[:, 1:] - dy[:, :-1] * dx[:, 1:]
+    beta = np.arctan2(cross_product, dot_product)
+    # a panel seen from its own midpoint subtends exactly pi
+    beta[np.arange(len(rows)), rows] = np.pi
 
-    sin_i_j = np.outer(st, ct) - np.outer(ct, st)
-    cos_i_j = np.outer(ct, ct) + np.outer(st, st)
+    return log_ratio, beta
 
-    # Initialize all variables
-    
-    r_ij = np.zeros((npanel, npanel, 2))
-    r_ij_1 = np.zeros((npanel, npanel, 2))
-    beta_ij = np.zeros((npanel, npanel))
-    u_s_star_ij = np.zeros((npanel, npanel))
-    v_s_star_ij = np.zeros((npanel, npanel))
 
-    # ---------------------------------------------------------------------------
-    # Step 4.2 Define the elements of the matrix of A aero influence coefficients
-    # ---------------------------------------------------------------------------
-    # ith panel (major loop)
-    for i in range(npanel):
+#################################################################################
+## Computes the rows of the influence coefficient matrix 'A' for flow tangency
+## boundary condition and Kutta condition, 'block_rows' rows at a time (all at
+## once by default), so the temporaries are (block_rows x npanel) instead of
+## (npanel x npanel). Yields (rows, block) for the flow tangency rows in order,
+## then (npanel, kutta_row) last.
+#################################################################################
 
-        # find contribution of the jth panel (inner loop)
-        for j in range(npanel):
+def influence_blocks(x, y, xbar, ybar, st, ct, npanel, block_rows=None):
 
-            # compute r_ij
-            r_ij[i, j] = [x[j] - xbar[i], y[j] - ybar[i]]
+    kutta = np.zeros(npanel + 1)
 
-            # compute r_ij+1
-            r_ij_1[i, j] = [x[j + 1] - xbar[i], y[j + 1] - ybar[i]]
+    block_rows = block_rows or npanel
+    for start in range(0, npanel, block_rows):
+        rows = slice(start, min(start + block_rows, npanel))
+        block = np.empty((rows.stop - rows.start, npanel + 1))
 
-            norm1 = np.linalg.norm(r_ij[i, j])
-            norm2 = np.linalg.norm(r_ij_1[i, j])
+        # -----------------------------------------------------------------------
+        # STEP 4.1 precompute common terms
+        # -----------------------------------------------------------------------
+        sin_i_j = np.outer(st[rows], ct) - np.outer(ct[rows], st)
+        cos_i_j = np.outer(ct[rows], ct) + np.outer(st[rows], st)
 
-            # compute beta_ij
-            if i == j:
-              beta_ij[i, j] = np.pi
-            else:
-                dot_product = np.dot(r_ij[i, j], r_ij_1[i, j])
-                cross_product = np.cross(r_ij[i, j], r_ij_1[i, j])
-                beta_ij[i, j] = np.arctan2(cross_product, dot_product)
+        log_ratio, beta_ij = influence_terms(x, y, xbar, ybar, npanel, rows)
 
-            # compute u_s_star_i_j
-            u_s_star_ij[i, j] = - np.log(norm2 / norm1) / (2 * np.pi)
+        # -----------------------------------------------------------------------
+        # Step 4.2 Define the elements of the matrix of A aero influence coefficients
+        # -----------------------------------------------------------------------
+        # flow tangency: normal velocity induced at panel i by the source on panel j
+        block[:, :npanel] = (sin_i_j * log_ratio + cos_i_j * beta_ij) / (2 * np.pi)
 
-            # compute v_s_star_i_j
-            v_s_star_ij[i, j] = beta_ij[i, j] / (2 * np.pi)
+        # flow tangency: normal velocity induced at panel i by the vortex on all panels
+        block[:, npanel] = np.sum(cos_i_j * log_ratio - sin_i_j * beta_ij, axis=1) / (2 * np.pi)
 
-            # compute all elements of A, the influence coefficient matrix
-            A[i, j] = sin_i_j[i, j] * -u_s_star_ij[i, j] + cos_i_j[i, j] * v_s_star_ij[i, j]
+        # Kutta condition: tangential velocities at the first and last panel
+        for i in (0, npanel - 1):
+            if rows.start <= i < rows.stop:
+                k = i - rows.start
+                kutta[:npanel] += (sin_i_j[k] * beta_ij[k] - cos_i_j[k] * log_ratio[k]) / (2 * np.pi)
+                kutta[npanel] += np.sum(block[k, :npanel])
 
-            if i == 0 or i == npanel - 1:
-                A[npanel, j] += (sin_i_j[i, j] * beta_ij[i, j] - cos_i_j[i, j] * np.log(norm2 / norm1)) / (2 * np.pi)
-                A[npanel, npanel] += A[i, j]
+        yield rows, block
 
-            A[i, npanel] += (cos_i_j[i, j] * np.log(norm2 / norm1) - sin_i_j[i, j] * beta_ij[i, j]) / (2 * np.pi)
+    yield npanel, kutta
 
 
+#################################################################################
+## Computes the influence coefficient matrix 'A' (of type 'dtype', each block is
+## assembled in float64 and rounded when stored). A is in Fortran order so that
+## lu_factor(A, overwrite_a=True) factors it in place.
+#################################################################################
+
+def infl_coeff(x, y, xbar, ybar, st, ct, npanel, block_rows=None, dtype=np.float64):
+
+    A = np.zeros((npanel + 1, npanel + 1), dtype=dtype, order="F")
+    for rows, block in influence_blocks(x, y, xbar, ybar, st, ct, npanel, block_rows):
+        A[rows] = block
+
+    return A
+
+
+#################################################################################
+## Float64 product A @ v without storing A: the rows of A are assembled again,
+## 'block_rows' at a time
+#################################################################################
+
+def influence_matvec(x, y, xbar, ybar, st, ct, npanel, v, block_rows=ASSEMBLY_BLOCK_ROWS):
+
+    Av = np.zeros((npanel + 1,) + np.shape(v)[1:])
+    for rows, block in influence_blocks(x, y, xbar, ybar, st, ct, npanel, block_rows):
+        Av[rows] = block @ v
+
+    return Av
+
+
+#################################################################################
+## LU factorization of 'A'. The singularity check looks at the pivots of U
+## (det(A) underflows to exactly 0 for a few thousand panels). With 'overwrite'
+## a Fortran ordered A is factored in place and must not be used afterwards.
+#################################################################################
+
+def factor_influence_matrix(A, overwrite=False):
+    lu_piv = la.lu_factor(A, overwrite_a=overwrite, check_finite=False)
+
     # check to see if matrix is singular
-    if np.linalg.det(A) == 0:
+    if np.any(np.diag(lu_piv[0]) == 0):
         raise ValueError("Matrix is singular")
 
-    return A
+    return lu_piv
 
 
 #################################################################################
-## Computes the surface velocities from source/vortex distribution at each panel  
+## Normwise backward error |r| / (|A| |lambda| + |b|) of a solution of
+## A lambda = b with residual r (infinity norms, worst column)
 #################################################################################
 
-def velocity_distribution(lambda_gamma, x, y, xbar, ybar, sin_theta, cos_theta, alpha, npanel):
+def backward_error(r, lambda_gamma, b, norm_A):
+    return np.max(np.max(np.abs(r), axis=0)
+                  / (norm_A * np.max(np.abs(lambda_gamma), axis=0) + np.max(np.abs(b), axis=0)))
 
-    # ---------------------------------------------------------------------------
-    # STEP 4.1 precompute common terms
-    # ---------------------------------------------------------------------------
 
-    # Need tangential velocity at each panel
-    vt = np.zeros(npanel)
+#################################################################################
+## Infinity norm of 'A' (largest row sum of |A|, in float64), summed in row
+## blocks so no |A| copy of the whole matrix is made
+#################################################################################
 
-    # Compute cosine and sine for i-j
-    sin_i_j = np.outer(sin_theta, cos_theta) - np.outer(cos_theta, sin_theta)
-    cos_i_j = np.outer(cos_theta, cos_theta) + np.outer(sin_theta, sin_theta)
+def infinity_norm(A, block_rows=ASSEMBLY_BLOCK_ROWS):
+    norm_A = 0.0
+    for start in range(0, A.shape[0], block_rows):
+        norm_A = max(norm_A, np.max(np.sum(np.abs(A[start:start + block_rows]), axis=1, dtype=np.float64)))
 
-    # ---------------------------------------------------------------------------
-    # STEP 7.2 allocate all necessary arrays
-    # ---------------------------------------------------------------------------
+    return norm_A
 
-    # Create empty arrays to be appended through iteration
-    r_ij = np.zeros((npanel, npanel, 2))
-    r_ij_1 = np.zeros((npanel, npanel, 2))
-    beta_ij = np.zeros((npanel, npanel))
 
-    # ---------------------------------------------------------------------------
-    # Step 7.3 flow tangency boundary condition - source distribution
-    # ---------------------------------------------------------------------------
-    # ith panel (major loop)
-    for i in range(npanel):
+#################################################################################
+## Mixed precision solve of A lambda = b. 'A32' is A rounded to float32, which
+## is factored in place (so no float64 copy of A is ever held), and the float32
+## solution is refined against the float64 residual r = b - A lambda, with
+## 'matvec' giving the float64 product A @ v (influence_matvec, matrix-free)
+## until the backward error reaches float64 level. Returns the solution, the
+## number of refinement steps, the final backward error and whether it reached
+## float64 level (it does not when A is too ill-conditioned for float32).
+#################################################################################
+
+def solve_mixed_precision(A32, b, matvec, max_refinements=MIXED_MAX_REFINEMENTS):
+    # |A| from the float32 entries is accurate enough to scale the backward error
+    norm_A = infinity_norm(A32)
+    lu_piv = factor_influence_matrix(A32, overwrite=True)
 
-        # Initialize sums
-        summation_1 = 0
-        summation_2 = 0
+    def solve32(r):
+        # scaled so the float32 right hand side neither overflows nor underflows
+        scale = np.max(np.abs(r), axis=0)
+        scale = np.where(scale > 0, scale, 1.0)
+        return la.lu_solve(lu_piv, (r / scale).astype(np.float32), check_finite=False) * scale
 
-        # find contribution of the jth panel (inner loop)
-        for j in range(npanel):
+    tol = np.finfo(np.float64).eps * np.sqrt(len(b))
 
-            # For r_ij, r_ij+1, beta_ij, same formula as infl_coeff
+    lambda_gamma = solve32(b).astype(np.float64)
+    r = b - matvec(lambda_gamma)
+    residual = backward_error(r, lambda_gamma, b, norm_A)
+    refinements = 0
+    while residual > tol and refinements < max_refinements:
+        lambda_gamma += solve32(r)
+        r = b - matvec(lambda_gamma)
+        previous, residual = residual, backward_error(r, lambda_gamma, b, norm_A)
+        refinements += 1
+        if residual > 0.5 * previous:
+            break
 
-            # compute r_ij
-            # Use equation from lecture
-            r_ij[i, j] = [x[j] - xbar[i], y[j] - ybar[i]]
+    return lambda_gamma, refinements, residual, residual <= tol
 
-            # compute r_ij+1
-            r_ij_1[i, j] = [x[j + 1] - xbar[i], y[j + 1] - ybar[i]]
 
-            norm1 = np.linalg.norm(r_ij[i, j])
-            norm2 = np.linalg.norm(r_ij_1[i, j])
+#################################################################################
+## Computes the matrix mapping [lambda_1..lambda_n, gamma] to the perturbation
+## tangential velocity at each panel midpoint (or only the midpoints in 'rows')
+#################################################################################
 
-            # compute beta_ij
+def tangential_velocity_matrix(x, y, xbar, ybar, sin_theta, cos_theta, npanel, rows=slice(None)):
 
-            if i == j:
-              beta_ij[i, j] = np.pi
-            else:
-                dot_product = np.dot(r_ij[i, j], r_ij_1[i, j])
-                cross_product = np.cross(r_ij[i, j], r_ij_1[i, j])
-                beta_ij[i, j] = np.arctan2(cross_product, dot_product)
+    st_i, ct_i = sin_theta[rows], cos_theta[rows]
+    V = np.zeros((len(st_i), npanel + 1))
 
-            # compute vt
+    sin_i_j = np.outer(st_i, cos_theta) - np.outer(ct_i, sin_theta)
+    cos_i_j = np.outer(ct_i, cos_theta) + np.outer(st_i, sin_theta)
 
-            # from class notes:
-            summation_1 += (lambda_gamma[j] / (2 * np.pi)) * (sin_i_j[i, j] * beta_ij[i, j] - cos_i_j[i, j] * np.log(norm2 / norm1))
-            summation_2 += (sin_i_j[i, j] * np.log(norm2 / norm1) + cos_i_j[i, j] * beta_ij[i, j])
+    log_ratio, beta_ij = influence_terms(x, y, xbar, ybar, npanel, rows)
 
-        cos_theta_i_alpha = cos_theta[i] * np.cos(alpha) + sin_theta[i] * np.sin(alpha)
-        # Assume V_inf = 0
-        vt[i] = cos_theta_i_alpha + summation_1 + (lambda_gamma[npanel] / (2 * np.pi)) * summation_2
+    # source contribution of each panel j
+    V[:, :npanel] = (sin_i_j * beta_ij - cos_i_j * log_ratio) / (2 * np.pi)
 
+    # vortex contribution (same strength gamma on every panel)
+    V[:, npanel] = np.sum(sin_i_j * log_ratio + cos_i_j * beta_ij, axis=1) / (2 * np.pi)
 
-    return vt
+    return V
 
 
 #################################################################################
-## Computes aerodynamic coefficients Cl, Cd, Cm
+## Computes the surface velocities from source/vortex distribution at each panel
 #################################################################################
 
-def aero_coeff(x, y, cp, al, npanel):
+def velocity_distribution(lambda_gamma, x, y, xbar, ybar, sin_theta, cos_theta, alpha, npanel,
+                          block_rows=ASSEMBLY_BLOCK_ROWS):
 
     # ---------------------------------------------------------------------------
-    # STEP 3.1 allocate all necessary arrays
+    # Step 7.1 freestream component (V_inf = 1)
     # ---------------------------------------------------------------------------
-    Cn = 0
-    Ca = 0
-    Cm = 0
+    vt = cos_theta * np.cos(alpha) + sin_theta * np.sin(alpha)
 
-    for i in range(npanel):
-        # compute dx
-        dx = x[i+1] - x[i]
+    # ---------------------------------------------------------------------------
+    # Step 7.2 add the induced tangential velocity from all sources and the
+    #          vortex, 'block_rows' midpoints at a time
+    # ---------------------------------------------------------------------------
+    for start in range(0, npanel, block_rows):
+        rows = slice(start, min(start + block_rows, npanel))
+        vt[rows] += tangential_velocity_matrix(x, y, xbar, ybar, sin_theta, cos_theta, npanel, rows) @ lambda_gamma
 
-        # compute dy
-        dy = y[i+1] - y[i]
+    return vt
 
-        # compute xa at quarter chord
-        xa = 0.5 * (x[i+1] + x[i]) - 0.25
 
-        # compute ya
-        ya = 0.5 * (y[i+1] + y[i])
+#################################################################################
+## Computes aerodynamic coefficients Cl, Cd, Cm. 'cp' may also be a (K, npanel)
+## stack of distributions (with 'al' scalar or shape (K,)), giving arrays of K
+## coefficients.
+#################################################################################
 
-        # compute dCn
-        dCn = -cp[i] * dx
+def aero_coeff(x, y, cp, al, npanel):
 
-        # compute dCa
-        dCa = cp[i] * dy
+    # ---------------------------------------------------------------------------
+    # STEP 3.1 panel projections and quarter chord moment arms
+    # ---------------------------------------------------------------------------
+    # compute dx, dy
+    dx = x[1:npanel + 1] - x[:npanel]
+    dy = y[1:npanel + 1] - y[:npanel]
 
-        # recursively compute Cn, Ca and Cm
-        Cn += dCn
-        Ca += dCa
-        Cm += - (dCn * xa) + (dCa * ya)
+    # compute xa at quarter chord, ya
+    xa = 0.5 * (x[1:npanel + 1] + x[:npanel]) - 0.25
+    ya = 0.5 * (y[1:npanel + 1] + y[:npanel])
+
+    # ---------------------------------------------------------------------------
+    # STEP 3.2 integrate dCn = -cp dx, dCa = cp dy over all panels
+    # ---------------------------------------------------------------------------
+    dCn = -cp * dx
+    dCa = cp * dy
+
+    Cn = np.sum(dCn, axis=-1)
+    Ca = np.sum(dCa, axis=-1)
+    Cm = np.sum(- (dCn * xa) + (dCa * ya), axis=-1)
 
     # compute Cl
     Cl  = Cn * np.cos(al) - Ca * np.sin(al)
@@ -302,12 +410,46 @@ def aero_coeff(x, y, cp, al, npanel):
     return Cl, Cd, Cm
 
 
+#################################################################################
+## Right hand side of the flow tangency + Kutta system for angle of attack 'al'
+## (radians). An array of angles gives one column per angle.
+#################################################################################
+
+def rhs_vector(sin_theta, cos_theta, al, npanel):
+    al = np.asarray(al, dtype=float)
+    cos_al = np.cos(al)
+    sin_al = np.sin(al)
+
+    b = np.zeros((npanel + 1,) + al.shape)
+    b[:npanel] = np.multiply.outer(sin_theta, cos_al) - np.multiply.outer(cos_theta, sin_al)
+    b[npanel] = -(cos_theta[0] * cos_al + sin_theta[0] * sin_al) - (cos_theta[npanel-1] * cos_al + sin_theta[npanel-1] * sin_al)
+
+    return b
+
+
+#################################################################################
+## Solves only for the source strengths and vortex strength [lambda, gamma]
+## (one column per angle when alpha is an array)
+#################################################################################
+
+def hess_smith_strengths(x, y, alpha):
+    npanel = len(x) - 1
+    l, sin_theta, cos_theta, xbar, ybar = panel_geometry(x, y, npanel)
+    A = infl_coeff(x, y, xbar, ybar, sin_theta, cos_theta, npanel)
+    b = rhs_vector(sin_theta, cos_theta, np.asarray(alpha) * np.pi / 180, npanel)
+
+    return la.lu_solve(factor_influence_matrix(A), b)
+
+
 #################################################################################
 ## Computes the surface surface pressure coefficient, force coefficients using 
-## all previously defined functions
+## all previously defined functions. The optional 'progress' callback is called
+## with the completed fraction after each step (raise from it to abort a solve).
+## 'lu_piv' is an existing factorization of A for this geometry (e.g. from a
+## cache), which skips the assembly in step 4 and the factorization in step 6.
 #################################################################################
 
-def hess_smith(x,y,alpha):
+def hess_smith(x,y,alpha, progress=None, lu_piv=None):
     # ---------------------------------------------------------------------------
     # STEP 1: allocate all necessary arrays
     # ---------------------------------------------------------------------------
@@ -323,36 +465,43 @@ def hess_smith(x,y,alpha):
     # STEP 3: generate panel geometry data for later use
     # ---------------------------------------------------------------------------
     [l, sin_theta, cos_theta, xbar, ybar] = panel_geometry(x, y, npanel)
+    if progress:
+        progress(0.05)
 
 
     # ---------------------------------------------------------------------------
     # STEP 4: compute matrix of aerodynamic influence coefficients
     # ---------------------------------------------------------------------------
-    A = np.zeros((npanel + 1, npanel + 1))
-    A = infl_coeff(x, y, xbar, ybar, sin_theta, cos_theta, npanel)
+    if lu_piv is None:
+        A = infl_coeff(x, y, xbar, ybar, sin_theta, cos_theta, npanel, ASSEMBLY_BLOCK_ROWS)
+    if progress:
+        progress(0.45)
 
 
     # ---------------------------------------------------------------------------
     # STEP 5: compute right hand side vector for the specified angle of attack
     # ---------------------------------------------------------------------------
-    b = np.zeros(npanel + 1)
     al = alpha * np.pi / 180
-
-    for i in range(npanel):
-        b[i] = sin_theta[i] * np.cos(al) - np.sin(al) * cos_theta[i]
-    b[npanel] = -(cos_theta[0] * np.cos(al) + sin_theta[0] * np.sin(al)) - (cos_theta[npanel-1] * np.cos(al) + sin_theta[npanel-1] * np.sin(al))
+    b = rhs_vector(sin_theta, cos_theta, al, npanel)
 
 
     # ---------------------------------------------------------------------------
     # STEP 6: solve matrix system for vector of lambda_i and gamma
     # ---------------------------------------------------------------------------
-    lambda_gamma = np.linalg.inv(A) @ b
+    if lu_piv is None:
+        lu_piv = factor_influence_matrix(A, overwrite=True)
+        del A
+    lambda_gamma = la.lu_solve(lu_piv, b)
+    if progress:
+        progress(0.7)
 
 
     # ---------------------------------------------------------------------------
     # STEP 7: compute the tangential velocity distribution at the midpoint of panels
     # ---------------------------------------------------------------------------
     vt = velocity_distribution(lambda_gamma, x, y, xbar, ybar, sin_theta, cos_theta, al, npanel)
+    if progress:
+        progress(0.95)
 
 
     # ---------------------------------------------------------------------------
@@ -364,15 +513,212 @@ def hess_smith(x,y,alpha):
     # STEP 9: compute force coefficients
     # ---------------------------------------------------------------------------
     cl, cd, cm = aero_coeff(x, y, cp, al, npanel)
+    if progress:
+        progress(1.0)
 
     return cl, cd, cm,cp, xbar, ybar, vt, cos_theta, sin_theta
 
 
+#################################################################################
+## Same as hess_smith with A stored and factored in float32 only and solved in
+## mixed precision (solve_mixed_precision), for half the memory of hess_smith.
+## Also returns the number of refinement steps and the final backward error of
+## the solve.
+#################################################################################
+
+def hess_smith_mixed(x, y, alpha, progress=None):
+    npanel = len(x) - 1
+
+    # ---------------------------------------------------------------------------
+    # STEP 1: panel geometry and blocked assembly of A, straight into float32
+    # ---------------------------------------------------------------------------
+    [l, sin_theta, cos_theta, xbar, ybar] = panel_geometry(x, y, npanel)
+    if progress:
+        progress(0.05)
+    A32 = infl_coeff(x, y, xbar, ybar, sin_theta, cos_theta, npanel, ASSEMBLY_BLOCK_ROWS, np.float32)
+    if progress:
+        progress(0.45)
+
+    # ---------------------------------------------------------------------------
+    # STEP 2: float32 factorization, refined to float64 accuracy against the
+    #         matrix-free float64 residual
+    # ---------------------------------------------------------------------------
+    al = alpha * np.pi / 180
+    b = rhs_vector(sin_theta, cos_theta, al, npanel)
+
+    def matvec(v):
+        return influence_matvec(x, y, xbar, ybar, sin_theta, cos_theta, npanel, v)
+
+    lambda_gamma, refinements, residual, converged = solve_mixed_precision(A32, b, matvec)
+    del A32
+    if not converged:
+        # A too ill-conditioned for float32: assemble and factor it in float64
+        warnings.warn("mixed precision refinement stalled, solving in float64")
+        A = infl_coeff(x, y, xbar, ybar, sin_theta, cos_theta, npanel, ASSEMBLY_BLOCK_ROWS)
+        norm_A = infinity_norm(A)
+        lambda_gamma = la.lu_solve(factor_influence_matrix(A, overwrite=True), b)
+        del A
+        residual = backward_error(b - matvec(lambda_gamma), lambda_gamma, b, norm_A)
+    if progress:
+        progress(0.7)
+
+    # ---------------------------------------------------------------------------
+    # STEP 3: tangential velocity, pressure and force coefficients
+    # ---------------------------------------------------------------------------
+    vt = velocity_distribution(lambda_gamma, x, y, xbar, ybar, sin_theta, cos_theta, al, npanel)
+    if progress:
+        progress(0.95)
+    cp = 1 - vt ** 2
+    cl, cd, cm = aero_coeff(x, y, cp, al, npanel)
+    if progress:
+        progress(1.0)
+
+    return cl, cd, cm, cp, xbar, ybar, vt, cos_theta, sin_theta, refinements, residual
+
+
+#################################################################################
+## True when the panelization is an exact mirror image about y = 0 (node k of
+## N+1 matches node N-k), as naca_4series_generator gives for 00xx sections
+## with an even number of panels. Panel i' = N-1-i is then the image of panel i.
+#################################################################################
+
+def is_mirror_symmetric(x, y):
+    npanel = len(x) - 1
+
+    return npanel % 2 == 0 and np.array_equal(x, x[::-1]) and np.array_equal(y, -y[::-1])
+
+
+#################################################################################
+## Same outputs as hess_smith for a mirror symmetric panelization (alpha may
+## also be an array, giving the hess_smith_sweep shapes). With the mirror
+## symmetry A[i',j'] = A[i,j], the vortex column and the Kutta row change sign,
+## and the freestream splits into
+##   cos(alpha): symmetric sources (lambda_j' = lambda_j), no vortex
+##               -> N/2 system  A[i,j] + A[i,j']
+##   sin(alpha): antisymmetric sources (lambda_j' = -lambda_j) plus the vortex
+##               -> N/2+1 system  A[i,j] - A[i,j'], vortex column, Kutta row
+## Only the first half of the rows of A (and of the velocity matrix) are
+## assembled, and they are shared by both systems.
+#################################################################################
+
+def hess_smith_symmetric(x, y, alpha, progress=None):
+    npanel = len(x) - 1
+    half = npanel // 2
+    [l, sin_theta, cos_theta, xbar, ybar] = panel_geometry(x, y, npanel)
+    if progress:
+        progress(0.05)
+
+    # ---------------------------------------------------------------------------
+    # STEP 1: influence terms for rows 0..N/2-1 only
+    # ---------------------------------------------------------------------------
+    rows = slice(0, half)
+    sin_i_j = np.outer(sin_theta[rows], cos_theta) - np.outer(cos_theta[rows], sin_theta)
+    cos_i_j = np.outer(cos_theta[rows], cos_theta) + np.outer(sin_theta[rows], sin_theta)
+    log_ratio, beta_ij = influence_terms(x, y, xbar, ybar, npanel, rows)
+
+    # normal (A) and tangential (V) velocity from each source, and from the vortex
+    A_source = (sin_i_j * log_ratio + cos_i_j * beta_ij) / (2 * np.pi)
+    A_vortex = np.sum(cos_i_j * log_ratio - sin_i_j * beta_ij, axis=1) / (2 * np.pi)
+    V_source = (sin_i_j * beta_ij - cos_i_j * log_ratio) / (2 * np.pi)
+    V_vortex = np.sum(sin_i_j * log_ratio + cos_i_j * beta_ij, axis=1) / (2 * np.pi)
+    if progress:
+        progress(0.45)
+
+    # ---------------------------------------------------------------------------
+    # STEP 2: the two half size systems (column j' of a row is column N-1-j)
+    # ---------------------------------------------------------------------------
+    mirrored = A_source[:, ::-1]
+    S = A_source[:, :half] + mirrored[:, :half]
+
+    # Kutta row: tangential velocity at panel 0 plus at its image, panel N-1
+    kutta = V_source[0] - V_source[0][::-1]
+    K = np.zeros((half + 1, half + 1))
+    K[:half, :half] = A_source[:, :half] - mirrored[:, :half]
+    K[:half, half] = A_vortex
+    K[half, :half] = 2 * kutta[:half]
+    K[half, half] = 2 * np.sum(A_source[0])
+
+    mu = la.lu_solve(factor_influence_matrix(S), sin_theta[:half])
+    nu_gamma = la.lu_solve(factor_influence_matrix(K),
+                           np.append(-cos_theta[:half], -2 * sin_theta[0]))
+    if progress:
+        progress(0.7)
+
+    # ---------------------------------------------------------------------------
+    # STEP 3: tangential velocity of each part on the first half, mirrored to
+    #         the second half (odd for the cos part, even for the sin part)
+    # ---------------------------------------------------------------------------
+    nu, gamma = nu_gamma[:half], nu_gamma[half]
+    vt_cos = cos_theta[:half] + V_source @ np.concatenate([mu, mu[::-1]])
+    vt_sin = sin_theta[:half] + V_source @ np.concatenate([nu, -nu[::-1]]) + V_vortex * gamma
+    vt_cos = np.concatenate([vt_cos, -vt_cos[::-1]])
+    vt_sin = np.concatenate([vt_sin, vt_sin[::-1]])
+
+    al = np.asarray(alpha, dtype=float) * np.pi / 180
+    vt = np.multiply.outer(np.cos(al), vt_cos) + np.multiply.outer(np.sin(al), vt_sin)
+    if progress:
+        progress(0.95)
+
+    # ---------------------------------------------------------------------------
+    # STEP 4: pressure and force coefficients
+    # ---------------------------------------------------------------------------
+    cp = 1 - vt ** 2
+    cl, cd, cm = aero_coeff(x, y, cp, al, npanel)
+    if progress:
+        progress(1.0)
+
+    return cl, cd, cm, cp, xbar, ybar, vt, cos_theta, sin_theta
+
+
+#################################################################################
+## Same outputs as hess_smith for an array of K angles of attack. A is assembled
+## and factored once and every angle is one more right hand side column, so cl,
+## cd, cm have shape (K,) and cp, vt have shape (K, npanel). 'lu_piv' is an
+## existing factorization of A, as in hess_smith. Mirror symmetric sections go
+## through hess_smith_symmetric.
+#################################################################################
+
+def hess_smith_sweep(x, y, alphas, lu_piv=None):
+    if lu_piv is None and is_mirror_symmetric(x, y):
+        return hess_smith_symmetric(x, y, np.atleast_1d(np.asarray(alphas, dtype=float)))
+
+    npanel = len(x) - 1
+    [l, sin_theta, cos_theta, xbar, ybar] = panel_geometry(x, y, npanel)
+
+    # ---------------------------------------------------------------------------
+    # STEP 1: one assembly and factorization, one column per angle of attack
+    # ---------------------------------------------------------------------------
+    if lu_piv is None:
+        A = infl_coeff(x, y, xbar, ybar, sin_theta, cos_theta, npanel, ASSEMBLY_BLOCK_ROWS)
+        lu_piv = factor_influence_matrix(A, overwrite=True)
+        del A
+    al = np.atleast_1d(np.asarray(alphas, dtype=float)) * np.pi / 180
+    b = rhs_vector(sin_theta, cos_theta, al, npanel)
+    lambda_gamma = la.lu_solve(lu_piv, b)
+
+    # ---------------------------------------------------------------------------
+    # STEP 2: tangential velocity (in row blocks) and cp for every angle
+    # ---------------------------------------------------------------------------
+    vt = np.multiply.outer(np.cos(al), cos_theta) + np.multiply.outer(np.sin(al), sin_theta)
+    for start in range(0, npanel, ASSEMBLY_BLOCK_ROWS):
+        rows = slice(start, min(start + ASSEMBLY_BLOCK_ROWS, npanel))
+        vt[:, rows] += (tangential_velocity_matrix(x, y, xbar, ybar, sin_theta, cos_theta, npanel, rows)
+                        @ lambda_gamma).T
+    cp = 1 - vt ** 2
+
+    # ---------------------------------------------------------------------------
+    # STEP 3: force coefficients for every angle
+    # ---------------------------------------------------------------------------
+    cl, cd, cm = aero_coeff(x, y, cp, al, npanel)
+
+    return cl, cd, cm, cp, xbar, ybar, vt, cos_theta, sin_theta
+
+
 #################################################################################
 ## EXAMPLE IMPLEMENTATION: Function returns cl, cd, cm, cp distribution.
 #################################################################################
 
-def pm(alpha, naca_list, npanel):
+def pm(alpha, naca_list, npanel, progress=None, precision="double"):
     # user input desired AoA
     alpha = alpha
     # user input desired NACA airfoil (type=list)
@@ -388,26 +734,49 @@ def pm(alpha, naca_list, npanel):
     # ---------------------------------------------------------------------------
     # run hess smith panel code
     # ---------------------------------------------------------------------------
-    cl, cd, cm, cp, xbar, ybar, vt, ct, st = hess_smith(x,y,alpha)
+    if precision == "mixed":
+        cl, cd, cm, cp, xbar, ybar, vt, ct, st, refinements, residual = hess_smith_mixed(x, y, alpha, progress)
+    elif is_mirror_symmetric(x, y):
+        cl, cd, cm, cp, xbar, ybar, vt, ct, st = hess_smith_symmetric(x, y, alpha, progress)
+    else:
+        cl, cd, cm, cp, xbar, ybar, vt, ct, st = hess_smith(x,y,alpha, progress)
     
     return cl, cd, cm, xbar, cp
 
 
-# -------------------------------------------------------------------------------
-#  NACA 2410 airfoil, 250 panels, AoA = 4 deg.
-# -------------------------------------------------------------------------------
-cl, cd, cm, xbar, cp = pm(4, [2,4,1,0], 250)
-
-fig = plt.figure(figsize=(12, 12), tight_layout=True)
-
-plt.plot(xbar, cp, 'b')
-plt.xlabel('Chord Position')
-plt.ylabel('$c_p$')
-plt.title("Presure Coefficient Plot")
-plt.ylim(1.25, -2.5)
-plt.grid(True)
-plt.show()
-
-print('Cl: ', cl)
-print('Cd: ', cd)
-print('Cm: ', cm)
\ No newline at end of file
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    # -------------------------------------------------------------------------------
+    #  NACA 2410 airfoil, 250 panels, AoA = 4 deg.
+    # -------------------------------------------------------------------------------
+    cl, cd, cm, xbar, cp = pm(4, [2,4,1,0], 250)
+
+    fig = plt.figure(figsize=(12, 12), tight_layout=True)
+
+    plt.plot(xbar, cp, 'b')
+    plt.xlabel('Chord Position')
+    plt.ylabel('$c_p$')
+    plt.title("Presure Coefficient Plot")
+    plt.ylim(1.25, -2.5)
+    plt.grid(True)
+    plt.show()
+
+    print('Cl: ', cl)
+    print('Cd: ', cd)
+    print('Cm: ', cm)
+
+    # -------------------------------------------------------------------------------
+    #  Same case with a float32 factorization refined to float64 accuracy
+    # -------------------------------------------------------------------------------
+    x, y = naca_4series_generator([2,4,1,0], 250)
+    cl, cd, cm, cp, xbar, ybar, vt, ct, st, refinements, residual = hess_smith_mixed(x, y, 4)
+    print(f'Mixed precision Cl: {cl} ({refinements} refinement steps, backward error {residual:.1e})')
+
+    # -------------------------------------------------------------------------------
+    #  NACA 0012: symmetric fast path checked against the full size solve
+    # -------------------------------------------------------------------------------
+    x, y = naca_4series_generator([0,0,1,2], 250)
+    full = hess_smith(x, y, 4)
+    half = hess_smith_symmetric(x, y, 4)
+    print(f'NACA 0012 Cl: {half[0]} (symmetric), {full[0]} (full), max |dcp| = {np.max(np.abs(half[3] - full[3])):.1e}')
@@ -0,0 +1,156 @@
+import numpy as np
+from hess_smith_panel_method import naca_4series_generator, hess_smith_strengths
+
+#################################################################################
+## Off-body velocity and pressure coefficient from a Hess-Smith solution
+## [lambda_1..lambda_n, gamma], evaluated for an arbitrary (M,2) point cloud.
+##
+## Points are processed in chunks so the (chunk, npanel+1) temporaries never
+## exceed FIELD_CHUNK_BYTES, whatever the size of the grid.
+#################################################################################
+
+FIELD_CHUNK_BYTES = 32 * 2 ** 20
+
+# number of (chunk, npanel+1) float64 temporaries alive at once in a chunk
+_FIELD_TEMPORARIES = 10
+
+
+def field_velocity(points, x, y, lambda_gamma, alpha, chunk_bytes=FIELD_CHUNK_BYTES):
+    # ---------------------------------------------------------------------------
+    # STEP 1: panel orientation and strengths
+    # ---------------------------------------------------------------------------
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    npanel = len(x) - 1
+    l = np.hypot(np.diff(x), np.diff(y))
+    cos_theta = np.diff(x) / l
+    sin_theta = np.diff(y) / l
+    lam = lambda_gamma[:npanel]
+    gamma = lambda_gamma[npanel]
+    al = alpha * np.pi / 180
+
+    u = np.empty(len(points))
+    v = np.empty(len(points))
+    inside = np.empty(len(points), dtype=bool)
+
+    rows = max(1, int(chunk_bytes // (_FIELD_TEMPORARIES * 8 * (npanel + 1))))
+
+    for start in range(0, len(points), rows):
+        stop = min(start + rows, len(points))
+
+        # -----------------------------------------------------------------------
+        # STEP 2: r_j and r_j+1 from each field point, same terms as infl_coeff
+        # -----------------------------------------------------------------------
+        dx = x[np.newaxis, :] - points[start:stop, 0, np.newaxis]
+        dy = y[np.newaxis, :] - points[start:stop, 1, np.newaxis]
+        log_r = 0.5 * np.log(dx ** 2 + dy ** 2)
+        log_ratio = log_r[:, 1:] - log_r[:, :-1]
+        beta = np.arctan2(dx[:, :-1] * dy[:, 1:] - dy[:, :-1] * dx[:, 1:],
+                          dx[:, :-1] * dx[:, 1:] + dy[:, :-1] * dy[:, 1:])
+
+        # -----------------------------------------------------------------------
+        # STEP 3: unit source velocity in each panel frame, rotated to x-y.
+        #         The vortex velocity in the panel frame is (v_s*, -u_s*).
+        # -----------------------------------------------------------------------
+        u_s = -log_ratio / (2 * np.pi)
+        v_s = beta / (2 * np.pi)
+
+        u[start:stop] = (np.cos(al) + (u_s * cos_theta - v_s * sin_theta) @ lam
+                         + gamma * np.sum(v_s * cos_theta + u_s * sin_theta, axis=1))
+        v[start:stop] = (np.sin(al) + (u_s * sin_theta + v_s * cos_theta) @ lam
+                         + gamma * np.sum(v_s * sin_theta - u_s * cos_theta, axis=1))
+
+        # the panels subtend a full turn from any point inside the airfoil
+        inside[start:stop] = np.abs(np.sum(beta, axis=1)) > np.pi
+
+    return u, v, inside
+
+
+#################################################################################
+## Velocity components and cp on a structured nx-by-ny grid (NaN inside the body)
+#################################################################################
+
+def field_grid(x, y, lambda_gamma, alpha, xlim=(-0.5, 1.5), ylim=(-0.6, 0.6), nx=200, ny=200):
+    X, Y = np.meshgrid(np.linspace(*xlim, nx), np.linspace(*ylim, ny))
+    u, v, inside = field_velocity(np.column_stack([X.ravel(), Y.ravel()]), x, y, lambda_gamma, alpha)
+
+    cp = 1 - (u ** 2 + v ** 2)
+    u[inside] = np.nan
+    v[inside] = np.nan
+    cp[inside] = np.nan
+
+    return X, Y, u.reshape(X.shape), v.reshape(X.shape), cp.reshape(X.shape)
+
+
+#################################################################################
+## Traces streamlines from an (S,2) array of seed points. All seeds advance
+## together (one field evaluation per RK2 stage), with a fixed arc-length step
+## ds along the local flow direction. A streamline stops when it enters the
+## body or leaves the bounding box.
+#################################################################################
+
+def trace_streamlines(seeds, x, y, lambda_gamma, alpha, ds=0.01, nsteps=500,
+                      xlim=(-0.5, 1.5), ylim=(-0.6, 0.6)):
+
+    def direction(p):
+        u, v, inside = field_velocity(p, x, y, lambda_gamma, alpha)
+        speed = np.hypot(u, v)
+        speed[speed == 0] = 1
+        return np.column_stack([u / speed, v / speed]), inside
+
+    pos = np.array(seeds, dtype=float).reshape(-1, 2)
+    paths = [[p.copy()] for p in pos]
+    active = np.ones(len(pos), dtype=bool)
+
+    for step in range(nsteps):
+        idx = np.flatnonzero(active)
+        if len(idx) == 0:
+            break
+
+        # a seed that stepped into the body stops at its previous point
+        d1, inside = direction(pos[idx])
+        for i in idx[inside]:
+            if len(paths[i]) > 1:
+                paths[i].pop()
+        active[idx[inside]] = False
+        idx, d1 = idx[~inside], d1[~inside]
+
+        # midpoint (RK2) step along the unit velocity
+        d2, _ = direction(pos[idx] + 0.5 * ds * d1)
+        pos[idx] += ds * d2
+
+        out = ((pos[idx, 0] < xlim[0]) | (pos[idx, 0] > xlim[1])
+               | (pos[idx, 1] < ylim[0]) | (pos[idx, 1] > ylim[1]))
+        for i in idx[~out]:
+            paths[i].append(pos[i].copy())
+        active[idx[out]] = False
+
+    return [np.array(path) for path in paths]
+
+
+if __name__ == "__main__":
+    import time
+    import matplotlib.pyplot as plt
+
+    # -------------------------------------------------------------------------------
+    #  NACA 2412 airfoil, 160 panels, AoA = 6 deg.
+    # -------------------------------------------------------------------------------
+    alpha = 6
+    x, y = naca_4series_generator([2,4,1,2], 160)
+    lambda_gamma = hess_smith_strengths(x, y, alpha)
+
+    t0 = time.perf_counter()
+    X, Y, U, V, CP = field_grid(x, y, lambda_gamma, alpha, nx=200, ny=200)
+    print(f'200x200 field: {time.perf_counter() - t0:.3f} s')
+
+    seeds = np.column_stack([np.full(25, -0.5), np.linspace(-0.5, 0.5, 25)])
+    lines = trace_streamlines(seeds, x, y, lambda_gamma, alpha)
+
+    fig = plt.figure(figsize=(12, 6), tight_layout=True)
+    plt.contourf(X, Y, CP, levels=np.linspace(-2, 1, 31), cmap='viridis')
+    plt.colorbar(label='$c_p$')
+    for line in lines:
+        plt.plot(line[:, 0], line[:, 1], 'w', linewidth=0.7)
+    plt.fill(x, y, color='k')
+    plt.axis('equal')
+    plt.title("Pressure Coefficient Field and Streamlines")
+    plt.show()
@@ -0,0 +1,216 @@
+import numpy as np
+import scipy.linalg as la
+import scipy.optimize as opt
+from hess_smith_panel_method import (naca_4series_params, naca_4series_shape, panel_geometry,
+                                     infl_coeff, tangential_velocity_matrix, rhs_vector, aero_coeff,
+                                     factor_influence_matrix)
+
+#################################################################################
+## Adjoint sensitivities of Cl and Cm with respect to the angle of attack and the
+## continuous NACA 4-series parameters, q = [alpha (deg), m, p, t].
+##
+## The panel system is R(lambda, q) = A(q) lambda - b(q) = 0. For an output J:
+##
+##     A^T psi = dJ/dlambda
+##     dJ/dq   = dJ/dq|lambda - psi^T dR/dq|lambda
+##
+## The adjoint solve reuses the LU factorization of A from the primal solve, so
+## one factorization gives the full gradient of both Cl and Cm. The partials at
+## fixed lambda only need the (cheap) assembly, never another solve.
+#################################################################################
+
+PARAM_NAMES = ("alpha", "m", "p", "t")
+
+# central difference steps for the partials at fixed lambda
+PARTIAL_STEPS = np.array([1e-4, 1e-6, 1e-6, 1e-6])
+
+
+#################################################################################
+## Geometry, influence matrix, right hand side and velocity matrix for q
+#################################################################################
+
+def _assemble(q, npanel):
+    alpha, m, p, t = q
+    x, y = naca_4series_shape(m, p, t, npanel)
+    l, sin_theta, cos_theta, xbar, ybar = panel_geometry(x, y, npanel)
+    A = infl_coeff(x, y, xbar, ybar, sin_theta, cos_theta, npanel)
+    V = tangential_velocity_matrix(x, y, xbar, ybar, sin_theta, cos_theta, npanel)
+    al = alpha * np.pi / 180
+
+    return x, y, sin_theta, cos_theta, A, V, al
+
+
+#################################################################################
+## Cl, Cm and surface tangential velocity for a given lambda/gamma vector
+#################################################################################
+
+def _outputs(lambda_gamma, x, y, sin_theta, cos_theta, V, al, npanel):
+    vt = cos_theta * np.cos(al) + sin_theta * np.sin(al) + V @ lambda_gamma
+    cp = 1 - vt ** 2
+    cl, cd, cm = aero_coeff(x, y, cp, al, npanel)
+
+    return cl, cm, vt
+
+
+#################################################################################
+## dCl/dlambda and dCm/dlambda, as the two columns of the adjoint right hand side
+#################################################################################
+
+def _output_gradients(x, y, vt, V, al):
+    dx = np.diff(x)
+    dy = np.diff(y)
+    xa = 0.5 * (x[1:] + x[:-1]) - 0.25
+    ya = 0.5 * (y[1:] + y[:-1])
+
+    # derivatives of the aero_coeff sums with respect to each panel cp
+    dcl_dcp = -dx * np.cos(al) - dy * np.sin(al)
+    dcm_dcp = dx * xa + dy * ya
+
+    # cp = 1 - vt^2, vt = V lambda + freestream
+    dj_dvt = np.column_stack([dcl_dcp, dcm_dcp]) * (-2 * vt)[:, np.newaxis]
+
+    return V.T @ dj_dvt
+
+
+#################################################################################
+## Solves the panel system once and returns Cl, Cm and their gradients with
+## respect to q = [alpha (deg), m, p, t]
+#################################################################################
+
+def hess_smith_sensitivities(alpha, m, p, t, npanel):
+    q = np.array([alpha, m, p, t], dtype=float)
+
+    # ---------------------------------------------------------------------------
+    # STEP 1: primal solve, keeping the factorization of A
+    # ---------------------------------------------------------------------------
+    x, y, sin_theta, cos_theta, A, V, al = _assemble(q, npanel)
+    b = rhs_vector(sin_theta, cos_theta, al, npanel)
+    lu_piv = factor_influence_matrix(A)
+    lambda_gamma = la.lu_solve(lu_piv, b)
+    cl, cm, vt = _outputs(lambda_gamma, x, y, sin_theta, cos_theta, V, al, npanel)
+
+    # ---------------------------------------------------------------------------
+    # STEP 2: adjoint solve for Cl and Cm together (A^T psi = dJ/dlambda)
+    # ---------------------------------------------------------------------------
+    psi = la.lu_solve(lu_piv, _output_gradients(x, y, vt, V, al), trans=1)
+
+    # ---------------------------------------------------------------------------
+    # STEP 3: partials of the residual and outputs at fixed lambda
+    # ---------------------------------------------------------------------------
+    dR_dq = np.zeros((npanel + 1, 4))
+    dJ_dq = np.zeros((2, 4))
+    for k in range(4):
+        h = PARTIAL_STEPS[k]
+        for sign in (1, -1):
+            qk = q.copy()
+            qk[k] += sign * h
+            if k == 0:
+                # alpha only enters through the freestream, A and V are unchanged
+                xk, yk, stk, ctk, Ak, Vk = x, y, sin_theta, cos_theta, A, V
+                alk = qk[0] * np.pi / 180
+            else:
+                xk, yk, stk, ctk, Ak, Vk, alk = _assemble(qk, npanel)
+            R = Ak @ lambda_gamma - rhs_vector(stk, ctk, alk, npanel)
+            clk, cmk, vtk = _outputs(lambda_gamma, xk, yk, stk, ctk, Vk, alk, npanel)
+            dR_dq[:, k] += sign * R / (2 * h)
+            dJ_dq[:, k] += sign * np.array([clk, cmk]) / (2 * h)
+
+    # ---------------------------------------------------------------------------
+    # STEP 4: total derivatives
+    # ---------------------------------------------------------------------------
+    grad = dJ_dq - psi.T @ dR_dq
+
+    return cl, cm, grad[0], grad[1]
+
+
+#################################################################################
+## Same as above, starting from the NACA digits (e.g. [2,4,1,2])
+#################################################################################
+
+def naca_sensitivities(alpha, naca_list, npanel):
+    m, p, t = naca_4series_params(naca_list)
+
+    return hess_smith_sensitivities(alpha, m, p, t, npanel)
+
+
+#################################################################################
+## Finds the camber, camber location and thickness that reach a target Cl with
+## minimum |Cm| (minimizes Cm^2 subject to Cl = cl_target). With
+## free_alpha=True the angle of attack is also a design variable.
+#################################################################################
+
+def optimize_naca(cl_target, alpha, npanel=100, x0=(0.02, 0.4, 0.12),
+                  bounds=((0.0, 0.09), (0.1, 0.9), (0.06, 0.24)),
+                  free_alpha=False, alpha_bounds=(-5.0, 12.0), tol=1e-8):
+
+    # ---------------------------------------------------------------------------
+    # STEP 1: design vector [m, p, t] or [alpha, m, p, t]
+    # ---------------------------------------------------------------------------
+    if free_alpha:
+        z0 = np.array([alpha, *x0], dtype=float)
+        zbounds = (alpha_bounds,) + tuple(bounds)
+    else:
+        z0 = np.array(x0, dtype=float)
+        zbounds = tuple(bounds)
+
+    # objective, constraint and both jacobians share one solve per design point
+    cache = {"z": None, "nsolve": 0}
+
+    def evaluate(z):
+        if cache["z"] is None or not np.array_equal(z, cache["z"]):
+            q = z if free_alpha else np.concatenate([[alpha], z])
+            cl, cm, dcl, dcm = hess_smith_sensitivities(*q, npanel)
+            if not free_alpha:
+                dcl, dcm = dcl[1:], dcm[1:]
+            cache.update(z=z.copy(), cl=cl, cm=cm, dcl=dcl, dcm=dcm)
+            cache["nsolve"] += 1
+        return cache
+
+    # ---------------------------------------------------------------------------
+    # STEP 2: SLSQP driven by the adjoint gradients
+    # ---------------------------------------------------------------------------
+    result = opt.minimize(
+        lambda z: evaluate(z)["cm"] ** 2,
+        z0,
+        jac=lambda z: 2 * evaluate(z)["cm"] * evaluate(z)["dcm"],
+        method="SLSQP",
+        bounds=zbounds,
+        constraints=[{"type": "eq",
+                      "fun": lambda z: evaluate(z)["cl"] - cl_target,
+                      "jac": lambda z: evaluate(z)["dcl"]}],
+        options={"ftol": tol, "maxiter": 100},
+    )
+
+    # ---------------------------------------------------------------------------
+    # STEP 3: report the optimum
+    # ---------------------------------------------------------------------------
+    final = evaluate(result.x)
+    if free_alpha:
+        alpha, m, p, t = result.x
+    else:
+        m, p, t = result.x
+
+    return {
+        "alpha": alpha, "m": m, "p": p, "t": t,
+        "cl": final["cl"], "cm": final["cm"],
+        "nsolve": cache["nsolve"], "success": result.success, "message": result.message,
+    }
+
+
+if __name__ == "__main__":
+    # -------------------------------------------------------------------------------
+    #  NACA 2412 sensitivities, 160 panels, AoA = 4 deg.
+    # -------------------------------------------------------------------------------
+    cl, cm, dcl, dcm = naca_sensitivities(4, [2,4,1,2], 160)
+    print('Cl: ', cl)
+    print('Cm: ', cm)
+    for name, gl, gm in zip(PARAM_NAMES, dcl, dcm):
+        print(f'd/d{name:5s}  dCl = {gl: .6f}   dCm = {gm: .6f}')
+
+    # -------------------------------------------------------------------------------
+    #  Cl = 0.6 at 4 deg with minimum |Cm|
+    # -------------------------------------------------------------------------------
+    best = optimize_naca(0.6, 4, npanel=160)
+    print()
+    print(f"m = {best['m']:.4f}, p = {best['p']:.4f}, t = {best['t']:.4f}")
+    print(f"Cl = {best['cl']:.4f}, Cm = {best['cm']:.2e}, panel solves: {best['nsolve']}")
@@ -0,0 +1,273 @@
+import itertools
+import queue
+import socket
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Connection
+from pathlib import Path
+
+from matrix_cache import CACHE_DIR, FactorizationCache
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+from hess_smith_panel_method import naca_4series_generator, hess_smith, hess_smith_symmetric, is_mirror_symmetric
+
+#################################################################################
+## Background execution of panel method solves for the Streamlit app.
+##
+## Solves run in a few worker processes shared by every session, so a large
+## npanel run never blocks a script rerun. Workers are plain subprocesses
+## (python -m solver_jobs) talking over a socketpair, like script_runner's: a
+## multiprocessing spawn child would first re-run the Streamlit script it was
+## started from. One thread per worker hands it queued jobs, relays its
+## progress, and cancels the job it is running when
+##   - a newer submit from the same session supersedes it
+##   - nobody has polled for it for ABANDON_AFTER seconds
+## Cancellation is cooperative: the worker looks for a cancel message every
+## time hess_smith reports progress, so a cancelled solve stops at its next step.
+##
+## Workers take the factorization of A from the host-wide FactorizationCache,
+## so a geometry already solved by any process on the machine is not factored
+## again. Symmetric (00xx) sections skip the cache: their two half size solves
+## cost less than reading a full factorization.
+#################################################################################
+
+ABANDON_AFTER = 30.0
+
+# how often a worker thread checks its running job for cancellation
+POLL_INTERVAL = 0.25
+
+
+class JobCancelled(Exception):
+    pass
+
+
+#################################################################################
+## Runs in a worker process
+#################################################################################
+
+_factor_caches = {}
+
+
+def _run_pm(connection, alpha, naca_list, npanel, cache_dir):
+
+    reached = 0.0
+
+    def report(fraction):
+        nonlocal reached
+        # the only message sent to a busy worker is "cancel"
+        if connection.poll() and connection.recv() == "cancel":
+            raise JobCancelled()
+        # hess_smith starts over at 0.05 after a factorization made by attach
+        if fraction > reached:
+            reached = fraction
+            connection.send(("progress", fraction))
+
+    report(0.0)
+    x, y = naca_4series_generator(naca_list, npanel)
+
+    if is_mirror_symmetric(x, y):
+        cl, cd, cm, cp, xbar, ybar, vt, ct, st = hess_smith_symmetric(x, y, alpha, report)
+    elif cache_dir is None:
+        cl, cd, cm, cp, xbar, ybar, vt, ct, st = hess_smith(x, y, alpha, report)
+    else:
+        if cache_dir not in _factor_caches:
+            _factor_caches[cache_dir] = FactorizationCache(cache_dir)
+        with _factor_caches[cache_dir].attach(x, y, report) as lu_piv:
+            cl, cd, cm, cp, xbar, ybar, vt, ct, st = hess_smith(x, y, alpha, report, lu_piv)
+
+    return cl, cd, cm, xbar, cp
+
+
+def _worker_main(connection):
+    while True:
+        try:
+            job = connection.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        if job == "cancel":
+            # sent for a job that finished before the message arrived
+            continue
+
+        try:
+            message = ("done", _run_pm(connection, *job))
+        except JobCancelled:
+            message = ("cancelled", None)
+        except Exception as error:
+            message = ("failed", error)
+        connection.send(message)
+
+
+#################################################################################
+## Worker processes plus job state, one instance per Streamlit server process
+#################################################################################
+
+class SolverJobManager:
+
+    def __init__(self, max_workers=2, abandon_after=ABANDON_AFTER, cache_dir=CACHE_DIR):
+        self.abandon_after = abandon_after
+        self.cache_dir = cache_dir
+        self._jobs = {}
+        self._queue = queue.Queue()
+        self._ids = itertools.count()
+        self._lock = threading.RLock()
+        self._closed = False
+        self._threads = [threading.Thread(target=self._serve, daemon=True) for _ in range(max_workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def _spawn(self):
+        parent, child = socket.socketpair()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "solver_jobs", str(child.fileno())],
+            cwd=Path(__file__).resolve().parent, pass_fds=(child.fileno(),),
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL)
+        child.close()
+
+        return process, Connection(parent.detach())
+
+    def _stale(self, job):
+        return job["cancelled"] or time.time() - job["heartbeat"] > self.abandon_after
+
+    # ---------------------------------------------------------------------------
+    # One thread per worker process: runs queued jobs on it one at a time and
+    # starts a fresh worker if it dies. A None job stops the thread.
+    # ---------------------------------------------------------------------------
+    def _serve(self):
+        process, connection = self._spawn()
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                break
+
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                if self._stale(job):
+                    self._finish(job_id, "cancelled")
+                    continue
+            try:
+                connection.send(job["args"])
+                state, value = self._follow(job, connection)
+            except (EOFError, OSError):
+                state, value = "failed", RuntimeError("the solver worker exited")
+                process.kill()
+                process.wait()
+                connection.close()
+                process, connection = self._spawn()
+            with self._lock:
+                self._finish(job_id, state, value)
+
+        try:
+            connection.send(None)
+        except OSError:
+            pass
+        process.wait()
+        connection.close()
+
+    # ---------------------------------------------------------------------------
+    # Relays the running job's progress until the worker is done with it, and
+    # asks the worker to stop once the job is cancelled or abandoned
+    # ---------------------------------------------------------------------------
+    def _follow(self, job, connection):
+        cancel_sent = False
+        while True:
+            if connection.poll(POLL_INTERVAL):
+                state, value = connection.recv()
+                if state != "progress":
+                    return state, value
+                job["progress"] = value
+            elif not cancel_sent and self._stale(job):
+                connection.send("cancel")
+                cancel_sent = True
+
+    # ---------------------------------------------------------------------------
+    # Drops finished jobs nobody has polled for abandon_after seconds (the
+    # visitor left before the result came in), with their results
+    # ---------------------------------------------------------------------------
+    def _prune(self):
+        now = time.time()
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job["state"] != "running" and now - job["heartbeat"] > self.abandon_after]:
+            del self._jobs[job_id]
+
+    def _finish(self, job_id, state, value=None):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        # nobody polls a cancelled or abandoned job, so drop it
+        if job["cancelled"] or state == "cancelled":
+            del self._jobs[job_id]
+            return
+        job["state"] = state
+        job["result"] = value
+
+    # ---------------------------------------------------------------------------
+    # Queues a solve and returns its job id. 'supersedes' is the previous job of
+    # the same session, which is cancelled.
+    # ---------------------------------------------------------------------------
+    def submit(self, alpha, naca_list, npanel, supersedes=None):
+        if supersedes is not None:
+            self.cancel(supersedes)
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("cannot submit a solve after shutdown")
+            self._prune()
+            job_id = next(self._ids)
+            self._jobs[job_id] = {"args": (alpha, list(naca_list), npanel, self.cache_dir), "state": "running",
+                                  "progress": 0.0, "result": None, "heartbeat": time.time(), "cancelled": False}
+        self._queue.put(job_id)
+
+        return job_id
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            if job["state"] == "running":
+                # dropped by its worker thread once the worker lets go
+                job["cancelled"] = True
+            else:
+                del self._jobs[job_id]
+
+    # ---------------------------------------------------------------------------
+    # Returns (state, progress, result) with state one of "running", "done",
+    # "failed" or "unknown" (never submitted, cancelled or abandoned). Polling
+    # keeps the job alive. A finished job is forgotten once its result has been
+    # returned.
+    # ---------------------------------------------------------------------------
+    def poll(self, job_id):
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+            if job is None:
+                return "unknown", 0.0, None
+            if job["state"] == "running":
+                job["heartbeat"] = time.time()
+                return "running", job["progress"], None
+
+            del self._jobs[job_id]
+            if job["state"] == "done":
+                return "done", 1.0, job["result"]
+            return job["state"], 0.0, job["result"]
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            for job in self._jobs.values():
+                job["cancelled"] = True
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+if __name__ == "__main__":
+    # worker process started by SolverJobManager._spawn
+    _worker_main(Connection(int(sys.argv[1])))